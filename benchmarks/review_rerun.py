@@ -0,0 +1,167 @@
+"""Time a review submit on the full reviewer page against a proxy for the card fragment rerun.
+
+Before the reviewer list was split into fragments, every review submit reran
+the whole app: theme CSS, claim-column checks, project refresh, filters and
+every card on the page. Now a submit reruns only its card and redraws the
+progress counters. This script builds a synthetic project in a temporary
+data directory and submits reviews of the first card on the page with
+Streamlit's AppTest harness:
+
+    python benchmarks/review_rerun.py --rows 20000 --page-size 25 --runs 20
+
+AppTest always reruns the whole script; it cannot rerun just a fragment. The
+card timing is therefore a proxy: the same submit, made in a script that holds
+only the card fragment and the progress counters, so it does the work a
+fragment rerun does plus AppTest's fixed per-run overhead. It does not include
+what Streamlit itself spends on a fragment rerun in a real browser session.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+FILE_KEY = 'nonlicensed_Benchmark_high_20240101_000000'
+USER = {'name': 'Benchmark', 'role': 'Reviewer'}
+
+
+def build_project(rows):
+    """A project shaped like an upload: the CSV columns plus the review metadata columns"""
+    return pd.DataFrame({
+        'FIDO': [f'F{i}' for i in range(rows)],
+        'BARCODE': [str(100000000 + i) for i in range(rows)],
+        'BRAND': [f'Brand {i % 50}' for i in range(rows)],
+        'BRAND_ID': ['null'] * rows,
+        'CATEGORY': [f'Grocery > Aisle {i % 20} > Shelf {i % 7}' for i in range(rows)],
+        'DESCRIPTION': [f'Product description {i}' for i in range(rows)],
+        'GMV': [float(i % 1000) for i in range(rows)],
+        'upload_date': '2024-01-01',
+        'status': 'Pending Review',
+        'uploader': 'Benchmark',
+        'reviewer': '',
+        'review_date': '',
+        'comments': '',
+        'priority': 'high',
+        'no_change': pd.NA,
+    })
+
+
+def card_fragment(file_key, user):
+    """Proxy for a card submit's rerun: only the card fragment and the progress counters"""
+    import streamlit as st
+    from app import load_session_state, show_review_card, show_review_progress
+
+    if 'uploaded_files' not in st.session_state:
+        st.session_state.uploaded_files = load_session_state()
+        st.session_state.current_user = user
+        st.session_state.review_row_states = {'file_key': file_key, 'rows': {}}
+    box = st.empty()
+    show_review_card(file_key, 0, 0, box)
+    show_review_progress(box, file_key)
+
+
+def check(at):
+    """Fail on an exception, error or warning: a refused review (a warning) was never queued"""
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    if at.error:
+        raise RuntimeError(at.error[0].value)
+    if at.warning:
+        raise RuntimeError(at.warning[0].value)
+
+
+def stored_description(fido):
+    from utils import storage
+    df = storage.load_project(FILE_KEY)
+    return df.loc[df['FIDO'] == fido, 'updated_description'].iloc[0]
+
+
+def wait_until_stored(fido, description, timeout=10):
+    """Wait for the background writer to store description as fido's updated description"""
+    deadline = time.monotonic() + timeout
+    while stored_description(fido) != description:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"review of {fido} was not stored: expected {description!r}, found {stored_description(fido)!r}")
+        time.sleep(0.05)
+
+
+def submit_first_card(at, description):
+    """Submit a review of the first card on the page; returns (its FIDO, seconds the rerun took)"""
+    # The first card's widgets are keyed <field>_0_<FIDO>
+    submit = next(button for button in at.button if str(button.key).startswith('submit_0_'))
+    suffix = submit.key[len('submit'):]
+    at.text_area(key=f'desc{suffix}').input(description)
+    submit.click()
+    start = time.perf_counter()
+    at.run()
+    seconds = time.perf_counter() - start
+    check(at)
+    return suffix.split('_', 2)[2], seconds
+
+
+def check_repeat_submits(at):
+    """Two submits in a row on the first card must both be stored, the second over the first"""
+    at.run()
+    check(at)
+    for run in range(2):
+        description = f'Repeat submit {run}'
+        fido, _ = submit_first_card(at, description)
+        wait_until_stored(fido, description)
+
+
+def time_submits(at, runs):
+    """Median seconds of ``runs`` review submits of the first card, after one warm-up run.
+
+    Every submit must be queued (no warning), and the last one must reach the store.
+    """
+    at.run()
+    check(at)
+    timings = []
+    for run in range(runs):
+        fido, seconds = submit_first_card(at, f'Benchmark edit {run}')
+        timings.append(seconds)
+    wait_until_stored(fido, f'Benchmark edit {runs - 1}')
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000, help="records in the synthetic project")
+    parser.add_argument('--page-size', type=int, default=25, choices=[10, 25, 50, 100], help="cards per reviewer page")
+    parser.add_argument('--runs', type=int, default=20, help="timed reruns of each kind")
+    args = parser.parse_args()
+
+    # The stores keep their files under ./data
+    os.chdir(tempfile.mkdtemp(prefix='fido-bench-'))
+    from utils import storage
+    storage.ensure_storage()
+    storage.save_project(FILE_KEY, build_project(args.rows))
+
+    full = AppTest.from_file(os.path.join(ROOT, 'main.py'), default_timeout=120)
+    full.session_state.current_user = USER
+    full.session_state.page_history = ['login', 'main', 'nonlicensed', 'nonlicensed_review']
+    full.session_state.selected_project = FILE_KEY
+    full.session_state.current_queue = 'nonlicensed'
+    full.session_state.review_page_size = args.page_size
+    check_repeat_submits(full)
+    full_seconds = time_submits(full, args.runs)
+
+    card = AppTest.from_function(card_fragment, args=(FILE_KEY, USER), default_timeout=120)
+    check_repeat_submits(card)
+    card_seconds = time_submits(card, args.runs)
+
+    print(f"{args.rows} records, {args.page_size} cards per page, median of {args.runs} submits")
+    print(f"  full app rerun:               {full_seconds * 1000:8.1f} ms")
+    print(f"  card fragment rerun (proxy):  {card_seconds * 1000:8.1f} ms")
+    print(f"  {full_seconds / card_seconds:.1f}x less work per submit")
+
+
+if __name__ == '__main__':
+    main()
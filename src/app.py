@@ -1,90 +1,438 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import time
-import pickle
+from itertools import chain
+import math
 import os
-import shutil
+import re
+import weakref
 
-# Add file storage constants
-STORAGE_DIR = "data"
-STORAGE_FILE = os.path.join(STORAGE_DIR, "uploaded_files.pkl")
+from utils import ingest, schema, storage
+from utils.analytics import compute_project_aggregates, compute_review_stats, resolve_gmv, review_stats_delta, review_stats_deltas
+from utils.columnar import REVIEW_COLUMNS
+from utils.compact import memory_report, set_cell, set_cells
+from utils.conflicts import ROW_STATE_COLUMNS, ConflictError, check_row, row_state
+from utils.dataset_cache import DatasetCache, editable_copy
+from utils.project_summary import build_project_summary, summary_row
+from utils.record_index import RecordIndex
+from utils.search_index import SearchIndex
+from utils.write_queue import WriteQueue
 
-# Create storage directory if it doesn't exist
-if not os.path.exists(STORAGE_DIR):
-    os.makedirs(STORAGE_DIR)
+# Page sizes offered in the reviewer's FIDO list
+REVIEW_PAGE_SIZES = [10, 25, 50, 100]
+
+# Pending rows focus mode reads ahead of the FIDO on screen
+FOCUS_PREFETCH = 10
+
+# Stylesheets: app.css for every theme, then theme-<mode>.css on top
+CSS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "css")
+
+# Create storage directory (and split any legacy single-file store) on startup
+try:
+    storage.ensure_storage()
+except Exception as e:
+    st.error(f"❌ Error preparing project storage: {e}")
+
+# Bring projects stored by older versions up to the current columns, once per server process
+try:
+    schema.migrate_projects(storage)
+except Exception as e:
+    st.error(f"❌ Error migrating stored projects: {e}")
+
+@st.cache_resource
+def get_dataset_cache():
+    """One DataFrame per project shared by every session in this server process"""
+    return DatasetCache()
+
+@st.cache_resource
+def get_record_index():
+    """Global FIDO / UPC -> (project, row) index shared by every session in this server process"""
+    return RecordIndex()
+
+@st.cache_resource
+def get_write_queue():
+    """Background writer for review submits shared by every session in this server process"""
+    cache = get_dataset_cache()
+
+    def on_written(file_key, expected_version, version, reviews):
+        if version is None:
+            cache.invalidate(file_key)
+        else:
+            # Sessions move to the new version without a reload: the cached copy plus these reviews is what was stored
+            cache.advance(file_key, expected_version, version, lambda df: with_reviews(df, reviews))
+
+    return WriteQueue(storage.append_reviews, on_written)
+
+@st.cache_data
+def get_theme_css(theme_mode):
+    """The <style> block for a theme, read from CSS_DIR and minified once per server process.
+
+    Every rerun sends the same short string instead of rebuilding several
+    hundred lines of CSS; the page uses system fonts, so nothing is fetched
+    from a font CDN.
+    """
+    css = []
+    for name in ("app.css", f"theme-{theme_mode}.css"):
+        with open(os.path.join(CSS_DIR, name), encoding="utf-8") as f:
+            css.append(f.read())
+    css = re.sub(r"/\*.*?\*/", "", "\n".join(css), flags=re.S)
+    # One rule per line is enough for the browser; indentation and blank lines are just payload
+    css = "\n".join(line.strip() for line in css.splitlines() if line.strip())
+    return f"<style>\n{css}\n</style>"
 
 # Function to save session state
-def save_session_state():
-    """Save uploaded files to disk"""
+def save_session_state(file_keys=None):
+    """Save uploaded files to disk.
+
+    Only the projects named in ``file_keys`` are written; with no keys every
+    project in the session is saved. Keys that are not in the session are
+    skipped: a stale project list must never remove someone else's upload, so
+    only delete_projects deletes.
+
+    A project is only written if nobody else has changed it since this session
+    loaded it. Returns the file_keys refused for that reason; they are reloaded
+    on the next refresh.
+    """
+    uploaded_files = st.session_state.uploaded_files
+    known_versions = st.session_state.setdefault('project_versions', {})
+    if file_keys is None:
+        file_keys = list(uploaded_files)
+    elif isinstance(file_keys, str):
+        file_keys = [file_keys]
+
+    cache = get_dataset_cache()
+    conflicts = []
+    for file_key in file_keys:
+        if file_key not in uploaded_files:
+            continue
+        try:
+            storage.save_project(file_key, uploaded_files[file_key], expected_version=known_versions.get(file_key))
+            save_project_meta(file_key, uploaded_files[file_key])
+        except ConflictError:
+            # Our copy is stale; drop it so the next refresh loads the stored one
+            known_versions.pop(file_key, None)
+            conflicts.append(file_key)
+        except Exception as e:
+            st.error(f"❌ Error saving project '{file_key}': {e}")
+        finally:
+            cache.invalidate(file_key)
+    return conflicts
+
+# Function to delete projects
+def delete_projects(file_keys):
+    """Delete projects from storage and from this session; only explicit delete actions call this"""
+    if isinstance(file_keys, str):
+        file_keys = [file_keys]
+
+    cache = get_dataset_cache()
+    for file_key in file_keys:
+        st.session_state.uploaded_files.pop(file_key, None)
+        st.session_state.get('project_versions', {}).pop(file_key, None)
+        try:
+            storage.delete_project(file_key)
+            get_record_index().remove_project(file_key)
+        except Exception as e:
+            st.error(f"❌ Error deleting project '{file_key}': {e}")
+        finally:
+            cache.invalidate(file_key)
+
+# Function to store a project's analytics aggregates and card summary
+def save_project_meta(file_key, df):
+    """Recompute a project's analytics aggregates and summary from scratch and store them with the project"""
+    meta = {
+        'aggregates': compute_project_aggregates(df),
+        'summary': build_project_summary(df),
+        'memory': memory_report(df),
+    }
     try:
-        # Ensure directory exists
-        if not os.path.exists(STORAGE_DIR):
-            os.makedirs(STORAGE_DIR)
-        
-        # Create a backup before saving
-        if os.path.exists(STORAGE_FILE):
-            backup_file = STORAGE_FILE + ".backup"
-            import shutil
-            shutil.copy2(STORAGE_FILE, backup_file)
-        
-        with open(STORAGE_FILE, 'wb') as f:
-            pickle.dump(st.session_state.uploaded_files, f)
-        
-        # Verify the save was successful
-        if os.path.exists(STORAGE_FILE):
-            # Try to load it back to verify integrity
-            with open(STORAGE_FILE, 'rb') as f:
-                test_data = pickle.load(f)
-                if not isinstance(test_data, dict):
-                    raise ValueError("Saved data is not a dictionary")
-        
+        storage.update_project_meta(file_key, meta)
     except Exception as e:
-        st.error(f"❌ Error saving session state: {e}")
-        # Try to restore from backup if available
-        backup_file = STORAGE_FILE + ".backup"
-        if os.path.exists(backup_file):
-            import shutil
-            shutil.copy2(backup_file, STORAGE_FILE)
-            st.warning("⚠️ Restored from backup due to save error")
+        st.error(f"❌ Error saving analytics for '{file_key}': {e}")
+    return meta
+
+# Function to load the project summary index
+def load_project_summaries(queue_type=None):
+    """Return {file_key: summary row} from the stored project metadata without loading DataFrames"""
+    try:
+        all_meta = storage.load_all_project_meta(queue_type)
+    except Exception as e:
+        st.error(f"❌ Error loading project summaries: {e}")
+        all_meta = {}
+
+    summaries = {}
+    for file_key, meta in all_meta.items():
+        row = summary_row(meta)
+        if row is None:
+            # Projects stored before the summary index existed get theirs built once
+            df = st.session_state.uploaded_files.get(file_key)
+            if df is None:
+                continue
+            row = summary_row(save_project_meta(file_key, df))
+        summaries[file_key] = row
+    return summaries
+
+# Function to build a project's CSV export
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_project_csv(file_key, version):
+    """CSV export of a project, built once per stored version"""
+    df = get_dataset_cache().get(file_key, version, storage.load_project)
+    if df is None:
+        return b''
+    return df.to_csv(index=False).encode('utf-8')
+
+# Function to persist a single review submission
+def record_review(file_key, row_index, fido_id, review_fields, stats_delta=None, expected_row=None):
+    """Apply one row's review to this session's copy and queue it for the background writer.
+
+    ``expected_row`` is the row's review state the reviewer was looking at; the
+    review is refused if another reviewer changed that row since. Reviews of
+    other rows in the meantime are merged. Returns True if the review was
+    queued; ``show_save_status`` reports when it is stored.
+    """
+    df = st.session_state.uploaded_files[file_key]
+    try:
+        # Our copy was refreshed at the start of this run; the writer re-checks against the store
+        check_row(fido_id, df.loc[row_index], expected_row)
+    except ConflictError as e:
+        show_review_conflict(file_key, fido_id, e)
+        return False
+
+    review = {
+        'row_index': row_index,
+        'fido': fido_id,
+        'fields': review_fields,
+        'reviewer': st.session_state.current_user['name'],
+        'stats_delta': stats_delta,
+        'expected_row': expected_row,
+    }
+    try:
+        ticket = get_write_queue().submit(
+            file_key, review, expected_version=st.session_state.get('project_versions', {}).get(file_key)
+        )
+    except Exception as e:
+        st.error(f"❌ Error saving review for FIDO {fido_id}: {e}")
+        return False
+
+    df = editable_project(file_key)
+    for column, value in review_fields.items():
+        set_cell(df, row_index, column, value)
+    st.session_state.setdefault('pending_writes', []).append(ticket)
+    return True
+
+# Function to get this session's own copy of a project before changing it
+def editable_project(file_key):
+    """This session's copy of a project, safe to change in place.
+
+    The DataFrames in the dataset cache are shared by every session and are
+    never changed in place, so unsaved, queued or refused changes stay out of
+    other sessions. The first change a session makes swaps in a copy whose
+    review columns are its own; the uploaded columns stay shared. The next
+    reload of the project replaces the copy with the shared DataFrame again.
+    """
+    df = st.session_state.uploaded_files[file_key]
+    copies = st.session_state.setdefault('project_copies', {})
+    copy = copies.get(file_key)
+    if copy is not None and copy[0]() is df:
+        return df
+    # A weak reference, so a copy the session has dropped is not kept alive
+    shared = shared_project(file_key)
+    df = editable_copy(df, REVIEW_COLUMNS)
+    copies[file_key] = (weakref.ref(df), shared)
+    st.session_state.uploaded_files[file_key] = df
+    return df
+
+# Function to get the shared DataFrame behind this session's copy of a project
+def shared_project(file_key):
+    """The cached DataFrame this session's copy of a project was made from (the session's one if it has no copy)"""
+    df = st.session_state.uploaded_files[file_key]
+    copy = st.session_state.get('project_copies', {}).get(file_key)
+    if copy is not None and copy[0]() is df:
+        return copy[1]
+    return df
+
+# Function to apply stored reviews to a copy of a project
+def with_reviews(df, reviews):
+    """A copy of df with the fields of reviews (dicts as given to storage.append_reviews) applied; df is not changed"""
+    df = editable_copy(df, REVIEW_COLUMNS)
+    for review in reviews:
+        for column, value in review['fields'].items():
+            set_cell(df, review['row_index'], column, value)
+    return df
+
+# Function to report a review refused because of a concurrent edit
+def show_review_conflict(file_key, fido_id, error):
+    """Warn about a conflicting review and make the next refresh load the stored project"""
+    reviewer = error.current.get('reviewer') or 'another user'
+    st.warning(f"⚠️ FIDO {fido_id} was updated by {reviewer} while you were editing it, so your review was not saved. The latest version is loaded; please check it and submit again.")
+    st.session_state.get('project_versions', {}).pop(file_key, None)
+    get_dataset_cache().invalidate(file_key)
+
+# Function to show whether this session's reviews are stored
+def show_save_status():
+    """Durability indicator: reviews still waiting for the background writer, and any it refused"""
+    if 'pending_writes' not in st.session_state:
+        return
+    tickets = st.session_state.pending_writes
+    status = get_write_queue().status(tickets)
+    for file_key, review, error in status['failed']:
+        if isinstance(error, ConflictError):
+            show_review_conflict(file_key, review['fido'], error)
+        else:
+            st.error(f"❌ Error saving review for FIDO {review['fido']}: {error}")
+            st.session_state.get('project_versions', {}).pop(file_key, None)
+            get_dataset_cache().invalidate(file_key)
+    if status['failed']:
+        # Drop the refused reviews from our copy
+        refresh_session_state()
+
+    if status['pending']:
+        st.caption(f"⏳ Saving {status['pending']} review{'s' if status['pending'] != 1 else ''}...")
+    else:
+        st.session_state.pending_writes = []
+        st.caption("💾 All reviews saved")
+
+# Function to apply one review decision to many FIDOs
+def apply_bulk_review(file_key, row_labels, action, value=None):
+    """Mark rows 'No Change Required' or give them one updated brand or category, with a single stored write.
+
+    Review fields the decision does not set keep their current updated value,
+    or the original value when there is none, as the single-row form does.
+    Returns the number of rows stored.
+    """
+    df = st.session_state.uploaded_files[file_key]
+    rows = df.loc[row_labels]
+
+    def current_or(column, original):
+        if column not in rows.columns:
+            return original
+        current = rows[column].astype(object)
+        # Blank means "not set", as in conflicts.row_state
+        return current.where(current.notna() & ~current.astype(str).isin(['', 'nan']), original)
+
+    original_category = rows['CATEGORY'].map(get_relevant_category).astype(object) if 'CATEGORY' in rows.columns else ''
+    original_brand = rows['BRAND'].astype(object) if 'BRAND' in rows.columns else ''
+    original_desc = rows['DESCRIPTION'].astype(object) if 'DESCRIPTION' in rows.columns else ''
+    updates = pd.DataFrame({
+        'updated_description': current_or('updated_description', original_desc),
+        'updated_category': value if action == 'category' else current_or('updated_category', original_category),
+        'updated_brand': value if action == 'brand' else current_or('updated_brand', original_brand),
+        'no_change': action == 'no_change',
+        'status': 'Reviewed',
+        'reviewer': st.session_state.current_user['name'],
+        'review_date': datetime.now().strftime("%Y-%m-%d"),
+    }, index=rows.index)
+    if action == 'no_change':
+        # Nothing changes, so the updated values are the originals
+        updates['updated_category'] = original_category
+        updates['updated_brand'] = original_brand
+        updates['updated_description'] = original_desc
+    updates = updates.fillna('')
+
+    # A stats delta per row, so the stored aggregates count exactly the reviews the store accepts
+    reviewed_rows = rows.copy()
+    for column in updates.columns:
+        set_cells(reviewed_rows, updates.index, column, updates[column])
+    stats_deltas = review_stats_deltas(rows, reviewed_rows)
+
+    fidos = rows['FIDO'] if 'FIDO' in rows.columns else pd.Series(rows.index, index=rows.index)
+    reviewer = st.session_state.current_user['name']
+    reviews = [
+        {
+            'row_index': row_label,
+            'fido': fido,
+            'fields': fields,
+            'reviewer': reviewer,
+            'stats_delta': stats_delta,
+            'expected_row': row_state(current),
+        }
+        for row_label, fido, fields, stats_delta, current in zip(
+            rows.index, fidos, updates.to_dict('records'), stats_deltas,
+            rows[[column for column in ROW_STATE_COLUMNS if column in rows.columns]].to_dict('records')
+        )
+    ]
+
+    # Queued single submits go first so they cannot land on top of this batch
+    get_write_queue().flush()
+    try:
+        version, rejected = storage.append_reviews(
+            file_key, reviews, expected_version=st.session_state.get('project_versions', {}).get(file_key)
+        )
+    except Exception as e:
+        st.error(f"❌ Error saving bulk review: {e}")
+        return 0
+
+    stored = updates
+    if rejected:
+        rejected_labels = [review['row_index'] for review, _ in rejected]
+        stored = updates.drop(index=rejected_labels)
+        st.warning(f"⚠️ {len(rejected)} FIDO{'s were' if len(rejected) != 1 else ' was'} changed by another user and left as they are.")
+    df = editable_project(file_key)
+    for column in stored.columns:
+        set_cells(df, stored.index, column, stored[column])
+
+    if version is not None and not rejected:
+        def with_stored(cached):
+            cached = editable_copy(cached, REVIEW_COLUMNS)
+            for column in stored.columns:
+                set_cells(cached, stored.index, column, stored[column])
+            return cached
+
+        # Sessions move to the new version without a reload, as after a queued write
+        get_dataset_cache().advance(file_key, st.session_state.get('project_versions', {}).get(file_key), version, with_stored)
+    else:
+        # The stored rows (and any we skipped) are reloaded from storage
+        st.session_state.get('project_versions', {}).pop(file_key, None)
+        get_dataset_cache().invalidate(file_key)
+    return len(stored)
+
+# Function to sync in-memory projects with what is on disk
+def sync_projects(uploaded_files, known_versions, keep=()):
+    """Reload projects whose version token changed and drop ones that were deleted.
+
+    Projects in ``keep`` are left as they are until their next sync.
+    """
+    versions = storage.project_versions()
+    cache = get_dataset_cache()
+
+    for file_key in list(uploaded_files):
+        if file_key not in versions:
+            del uploaded_files[file_key]
+            known_versions.pop(file_key, None)
+            cache.invalidate(file_key)
+
+    for file_key, version in versions.items():
+        if file_key in uploaded_files and (known_versions.get(file_key) == version or file_key in keep):
+            continue
+        try:
+            # Shared across sessions, so only the first session to see a new version reads it
+            df = cache.get(file_key, version, storage.load_project)
+        except Exception as e:
+            st.warning(f"⚠️ Skipped unreadable project '{file_key}': {e}")
+            continue
+        if df is not None:
+            uploaded_files[file_key] = df
+            known_versions[file_key] = version
 
 # Function to load session state
 def load_session_state():
     """Load uploaded files from disk"""
-    if os.path.exists(STORAGE_FILE):
-        try:
-            with open(STORAGE_FILE, 'rb') as f:
-                data = pickle.load(f)
-                if isinstance(data, dict):
-                    return data
-                else:
-                    st.warning("⚠️ Invalid data format in storage file")
-                    return {}
-        except Exception as e:
-            st.error(f"❌ Error loading session state: {e}")
-            # Try to load from backup
-            backup_file = STORAGE_FILE + ".backup"
-            if os.path.exists(backup_file):
-                try:
-                    with open(backup_file, 'rb') as f:
-                        data = pickle.load(f)
-                        if isinstance(data, dict):
-                            st.warning("⚠️ Loaded from backup due to corrupted main file")
-                            return data
-                except Exception:
-                    pass
-            return {}
-    return {}
+    data = {}
+    st.session_state.project_versions = {}
+    try:
+        sync_projects(data, st.session_state.project_versions)
+    except Exception as e:
+        st.error(f"❌ Error loading session state: {e}")
+    return data
 
 # Function to refresh session state from disk (for real-time updates)
 def refresh_session_state():
-    """Refresh uploaded files from disk to get latest updates"""
+    """Refresh uploaded files from disk, reloading only projects that changed"""
+    if 'project_versions' not in st.session_state:
+        st.session_state.project_versions = {}
     try:
-        latest_data = load_session_state()
-        if isinstance(latest_data, dict):
-            st.session_state.uploaded_files = latest_data
-        else:
-            st.warning("⚠️ Could not refresh session state - invalid data format")
+        # Our copy holds reviews still waiting for the writer, which the stored one lacks
+        queued = get_write_queue().pending_projects(st.session_state.get('pending_writes', []))
+        sync_projects(st.session_state.uploaded_files, st.session_state.project_versions, keep=queued)
     except Exception as e:
         st.error(f"❌ Error refreshing session state: {e}")
 
@@ -100,50 +448,53 @@ def find_gmv_column(df):
     
     return None
 
-# Function to get GMV sum from a dataframe
-def get_gmv_sum(df):
-    """Get the sum of GMV values from any GMV-related column"""
-    gmv_col = find_gmv_column(df)
-    if gmv_col:
-        try:
-            # Convert to numeric, replacing non-numeric values with 0
-            numeric_series = pd.to_numeric(df[gmv_col], errors='coerce').fillna(0)
-            total = float(numeric_series.sum())
-            return total
-        except Exception as e:
-            st.error(f"❌ Error calculating GMV sum: {e}")
-            return 0.0
-    return 0.0
-
-# Function to get GMV value from a row
-def get_gmv_value(row, df_columns=None):
-    """Get GMV value from a row, checking for any GMV-related column"""
-    if df_columns is not None and len(df_columns) > 0:
-        gmv_col = None
-        for col in df_columns:
-            if 'gmv' in str(col).lower():
-                gmv_col = col
-                break
-        if gmv_col:
-            try:
-                value = pd.to_numeric(row.get(gmv_col, 0), errors='coerce')
-                return float(value) if pd.notna(value) else 0.0
-            except Exception as e:
-                # Use st.write instead of print for Streamlit visibility
-                st.error(f"❌ Error getting GMV value from '{gmv_col}': {e}")
-                return 0.0
-    
-    # Fallback: check the row itself for GMV-related keys
-    if hasattr(row, 'index'):
-        for key in row.index:
-            if 'gmv' in str(key).lower():
-                try:
-                    value = pd.to_numeric(row.get(key, 0), errors='coerce')
-                    return float(value) if pd.notna(value) else 0.0
-                except Exception as e:
-                    st.error(f"❌ Error getting GMV value from key '{key}': {e}")
-                    return 0.0
-    return 0.0
+# Function to get a project's resolved GMV
+def get_project_gmv(file_key):
+    """GMV column, numeric per-row GMV and total of a project, resolved once per stored version"""
+    df = shared_project(file_key)
+    version = st.session_state.get('project_versions', {}).get(file_key)
+    return get_dataset_cache().derived(file_key, version, 'gmv', df, resolve_gmv)
+
+# Function to get a project's search index
+def get_search_index(file_key):
+    """Search index over a project's FIDO, UPC, brand, category and description"""
+    df = shared_project(file_key)
+    # Reviews never write the searched columns, so one index serves until the DataFrame is reloaded
+    return get_dataset_cache().derived(file_key, None, 'search', df, SearchIndex)
+
+# Function to index the projects the global record index has not seen yet
+@st.cache_resource(show_spinner=False)
+def sync_record_index():
+    """Index stored projects missing from the global index, once per server process.
+
+    Uploads index their project themselves, so this only catches projects
+    stored before the index existed. Returns {file_key: error} of the
+    projects that could not be indexed.
+    """
+    return get_record_index().sync(storage.list_projects(), storage.load_project)
+
+# Function to find records by FIDO or UPC across all projects
+def find_records(value):
+    """Return [(file_key, row label), ...] for an exact FIDO or UPC from the global index"""
+    try:
+        failed = sync_record_index()
+    except Exception as e:
+        st.warning(f"⚠️ Could not update the FIDO lookup index: {e}")
+    else:
+        if failed:
+            st.warning(f"⚠️ FIDO lookup could not index {len(failed)} project{'s' if len(failed) != 1 else ''}: {', '.join(sorted(failed))}")
+    return get_record_index().lookup(value)
+
+# Function to open a record in its project's review page
+def open_record(file_key, value):
+    """Jump to the review page of file_key filtered down to the record with this FIDO or UPC"""
+    queue_type = file_key.split('_')[0]
+    st.session_state.selected_project = file_key
+    st.session_state.current_queue = queue_type
+    # The review page's own filters, preset so it opens on just this record
+    st.session_state.status_filter = "All"
+    st.session_state.search_filter = str(value)
+    navigate_to(f"{queue_type}_review")
 
 # Function to extract relevant category (part after last ">")
 def get_relevant_category(category_hierarchy):
@@ -159,6 +510,20 @@ def get_relevant_category(category_hierarchy):
         # If no ">" found, return the original category
         return category_str
 
+# Function to queue a message for after the next rerun
+def flash(message, kind="success"):
+    """Show message on the next run; anything drawn right before st.rerun() is never seen.
+
+    ``kind`` names the Streamlit element used: success, info, warning or toast.
+    """
+    st.session_state.setdefault('flash_messages', []).append((kind, message))
+
+# Function to show queued flash messages
+def show_flash_messages():
+    """Show and clear the messages queued by flash()"""
+    for kind, message in st.session_state.pop('flash_messages', []):
+        getattr(st, kind)(message)
+
 def navigate_to(page):
     """Handle navigation between pages"""
     if page not in st.session_state.page_history:
@@ -198,8 +563,7 @@ def show_login_panel():
         
         if login_button and name and role:
             st.session_state.current_user = {"name": name, "role": role}
-            st.success(f"Welcome, {name}! 👋")
-            time.sleep(1)
+            flash(f"Welcome, {name}! 👋")
             navigate_to('main')
         elif login_button:
             st.error("Please fill in all fields")
@@ -212,8 +576,7 @@ def show_main_page():
         if st.button('🚪 Sign Out', key="signout_button"):
             st.session_state.current_user = None
             st.session_state.page_history = ['login']
-            st.success("👋 Signed out successfully!")
-            time.sleep(1)
+            flash("👋 Signed out successfully!")
             st.rerun()
     
     # Welcome message with user info
@@ -225,6 +588,8 @@ def show_main_page():
     with col2:
         if st.button("📊 Overview", type="secondary"):
             navigate_to('overview')
+        if st.button("🔎 Find FIDO", type="secondary"):
+            navigate_to('lookup')
     
     st.markdown("---")
     
@@ -372,21 +737,56 @@ def show_main_page():
             if st.button("📈 Analytics", type="secondary", use_container_width=True):
                 navigate_to('analytics')
 
+# Function to display the FIDO lookup page
+def show_lookup_page():
+    show_back_button('lookup')
+    st.header("🔎 Find a FIDO")
+    st.markdown("Look up a FIDO or UPC across every project and jump straight to its record.")
+
+    value = st.text_input("FIDO or UPC:", placeholder="Enter an exact FIDO or UPC", key="lookup_value").strip()
+    if not value:
+        return
+
+    matches = find_records(value)
+    if matches:
+        # Matches can be in projects uploaded since this session last loaded its projects
+        refresh_session_state()
+    rows = []
+    for file_key, row_label in matches:
+        df = st.session_state.uploaded_files.get(file_key)
+        # Projects deleted since the index was read are left out
+        if df is not None and row_label in df.index:
+            rows.append((file_key, row_label, df.loc[row_label]))
+    if not rows:
+        st.info(f"No record with FIDO or UPC '{value}' was found.")
+        return
+
+    st.markdown(f"**{len(rows)} matching record{'s' if len(rows) != 1 else ''}**")
+    for file_key, row_label, row in rows:
+        queue_type = file_key.split('_')[0]
+        col_info, col_open = st.columns([4, 1])
+        with col_info:
+            st.markdown(
+                f"**FIDO {row.get('FIDO', 'N/A')}** · UPC {row.get('BARCODE', 'N/A')} · "
+                f"{file_key.split('_')[1]} ({queue_type.upper()}) · {row.get('status', 'N/A')}"
+            )
+        with col_open:
+            if st.button("➡️ Open", key=f"lookup_open_{file_key}_{row_label}", use_container_width=True):
+                open_record(file_key, value)
+
 def show_overview_page():
     show_back_button('overview')
     st.header("📊 Project Overview Dashboard")
 
-    # Refresh data to ensure we see latest changes from all users
-    refresh_session_state()
-    
     # Add refresh button
     if st.button("🔄 Refresh Data", help="Refresh to see latest changes from all users"):
         refresh_session_state()
         st.rerun()
 
     # Gather all projects - visible to ALL users
+    # Cards come from the stored summary index, which every write keeps current
     all_projects = []
-    for file_key, df in st.session_state.uploaded_files.items():
+    for file_key, summary in load_project_summaries().items():
         parts = file_key.split('_')
         if len(parts) < 2:  # Skip malformed keys
             continue
@@ -399,12 +799,12 @@ def show_overview_page():
         except (ValueError, IndexError):
             formatted_date = "Unknown"
             
-        uploader = df['uploader'].iloc[0] if 'uploader' in df.columns else "Unknown"
-        priority = df['priority'].iloc[0] if 'priority' in df.columns else "medium"
-        total_records = len(df)
-        reviewed = len(df[df['status'] == 'Reviewed'])
+        uploader = summary['uploader']
+        priority = summary['priority']
+        total_records = summary['total']
+        reviewed = summary['reviewed']
         
-        gmv = get_gmv_sum(df)
+        gmv = summary['gmv']
 
         all_projects.append({
             "queue_type": queue_type,
@@ -550,11 +950,7 @@ def show_overview_page():
                 with col_confirm2:
                     if st.button("✅ Delete", key=f"overview_confirm_btn_{proj['file_key']}", type="primary", use_container_width=True):
                             # Delete the file
-                            if proj['file_key'] in st.session_state.uploaded_files:
-                                del st.session_state.uploaded_files[proj['file_key']]
-                            
-                            # Save the updated state
-                            save_session_state()
+                            delete_projects(proj['file_key'])
                             
                             # Refresh to ensure immediate visibility across users
                             refresh_session_state()
@@ -563,28 +959,21 @@ def show_overview_page():
                             if f"overview_confirm_delete_{proj['file_key']}" in st.session_state:
                                 del st.session_state[f"overview_confirm_delete_{proj['file_key']}"]
                             
-                            st.success(f"✅ Project '{proj['project_name']}' deleted!")
-                            time.sleep(1)
+                            flash(f"✅ Project '{proj['project_name']}' deleted!")
                             st.rerun()
 
 def handle_file_upload(uploaded_file, queue_type, project_title, priority="medium"):
     if uploaded_file is not None:
         try:
-            # Reset file pointer to beginning
-            uploaded_file.seek(0)
-            
-            # Read the file content to check if it's empty
-            content = uploaded_file.read()
-            if not content or len(content.strip()) == 0:
+            # Check for content from the first non-blank bytes instead of reading the whole file
+            if not ingest.has_content(uploaded_file):
                 st.error("❌ The uploaded file is empty. Please upload a file with data.")
                 return False
             
-            # Reset file pointer again for pandas to read
-            uploaded_file.seek(0)
-            
-            # Try to read with different parameters to handle various CSV formats
+            # Parse the file once, in chunks; the first chunk tells us the columns
             try:
-                df = pd.read_csv(uploaded_file)
+                chunks = ingest.read_chunks(uploaded_file)
+                first_chunk = next(chunks, None)
             except pd.errors.EmptyDataError:
                 st.error("❌ The CSV file contains no data or has no columns.")
                 return False
@@ -593,55 +982,70 @@ def handle_file_upload(uploaded_file, queue_type, project_title, priority="mediu
                 return False
             
             # Check if dataframe is empty
-            if df.empty:
+            if first_chunk is None or first_chunk.empty:
                 st.error("❌ The CSV file contains no data rows.")
                 return False
             
             # Check if dataframe has no columns
-            if len(df.columns) == 0:
+            if len(first_chunk.columns) == 0:
                 st.error("❌ The CSV file has no columns. Please ensure the file has proper headers.")
                 return False
             
             current_time = datetime.now()
             
-            # Add metadata columns
-            df['upload_date'] = current_time.strftime("%Y-%m-%d")
-            df['status'] = 'Pending Review'
-            df['uploader'] = st.session_state.current_user['name']
-            df['reviewer'] = ''
-            df['review_date'] = ''
-            df['comments'] = ''
-            df['priority'] = priority
+            # Metadata columns added to every row
+            metadata = {
+                'upload_date': current_time.strftime("%Y-%m-%d"),
+                'status': 'Pending Review',
+                'uploader': st.session_state.current_user['name'],
+                'reviewer': '',
+                'review_date': '',
+                'comments': '',
+                'priority': priority,
+                'no_change': pd.NA,
+            }
             
             # Handle GMV - ensure we have a standardized GMV column
-            st.subheader("🔍 GMV Column Detection")
-            gmv_col = find_gmv_column(df)
+            gmv_col = find_gmv_column(first_chunk)
             if gmv_col and gmv_col != 'GMV':
                 # Copy the GMV column to standardized name and keep original
-                try:
-                    df['GMV'] = pd.to_numeric(df[gmv_col], errors='coerce').fillna(0)
-                    st.success(f"✅ Copied '{gmv_col}' to standardized 'GMV' column")
-                except Exception as e:
-                    st.error(f"❌ Error processing GMV column {gmv_col}: {e}")
-                    df['GMV'] = 0.0
+                gmv_message = (f"✅ Copied '{gmv_col}' to standardized 'GMV' column", "success")
             elif not gmv_col:
                 # No GMV column found, create one with zeros
-                df['GMV'] = 0.0
-                st.warning("⚠️ No GMV column found - created 'GMV' column with zeros")
+                gmv_message = ("⚠️ No GMV column found - created 'GMV' column with zeros", "warning")
             else:
                 # GMV column exists, ensure it's numeric
-                try:
-                    df['GMV'] = pd.to_numeric(df['GMV'], errors='coerce').fillna(0)
-                    st.success("✅ Existing 'GMV' column processed and validated")
-                except Exception as e:
-                    st.error(f"❌ Error processing existing GMV column: {e}")
-                    df['GMV'] = 0.0
+                gmv_message = ("✅ Existing 'GMV' column processed and validated", "success")
 
             formatted_date = current_time.strftime('%Y%m%d_%H%M%S')
             file_key = f"{queue_type}_{project_title}_{priority}_{formatted_date}"
             
+            # Each chunk goes to the store as it is parsed
+            try:
+                df = storage.save_project_chunks(
+                    file_key,
+                    (schema.at_current_version(ingest.add_upload_columns(chunk, metadata, gmv_col))
+                     for chunk in chain([first_chunk], chunks))
+                )
+            except pd.errors.ParserError as pe:
+                st.error(f"❌ Error parsing CSV file: {str(pe)}")
+                return False
+            # Shown after the page reruns, together with the upload confirmation
+            flash(*gmv_message)
+            memory = save_project_meta(file_key, df)['memory']
+            storage.update_project_meta(file_key, {'schema_version': schema.SCHEMA_VERSION})
+            try:
+                get_record_index().add_project(file_key, df)
+            except Exception as e:
+                flash(f"⚠️ Project saved, but FIDO lookup could not index it yet: {e}", "warning")
+            if memory['object_bytes']:
+                flash(f"🗜️ Stored in {memory['compact_bytes'] / (1024 * 1024):.1f} MB instead of {memory['object_bytes'] / (1024 * 1024):.1f} MB as plain object columns ({memory['object_bytes'] / max(memory['compact_bytes'], 1):.1f}x smaller)", "info")
+            
+            # The stored copy is the one this session and the shared cache use
             st.session_state.uploaded_files[file_key] = df
-            save_session_state()
+            version = storage.project_version(file_key)
+            st.session_state.setdefault('project_versions', {})[file_key] = version
+            get_dataset_cache().put(file_key, version, df)
             
             # Refresh to ensure immediate visibility across users  
             refresh_session_state()
@@ -682,35 +1086,25 @@ def show_upload_page():
             st.success("✅ File loaded successfully!")
             # Show file preview
             try:
-                # Reset file pointer for preview
-                uploaded_file.seek(0)
-                
-                # Check if file has content
-                content = uploaded_file.read()
-                if not content or len(content.strip()) == 0:
+                # Only the first rows are parsed for the preview
+                if not ingest.has_content(uploaded_file):
                     st.warning("⚠️ The uploaded file appears to be empty.")
                 else:
-                    # Reset file pointer for pandas
-                    uploaded_file.seek(0)
-                    
                     # Try to preview the file
                     try:
-                        preview_df = pd.read_csv(uploaded_file)
+                        preview_df = ingest.read_preview(uploaded_file)
                         if preview_df.empty:
                             st.warning("⚠️ The CSV file contains no data rows.")
                         elif len(preview_df.columns) == 0:
                             st.warning("⚠️ The CSV file has no columns.")
                         else:
                             st.markdown("**File Preview:**")
-                            st.dataframe(preview_df.head(), use_container_width=True)
-                            st.info(f"📊 File contains {len(preview_df)} rows and {len(preview_df.columns)} columns")
+                            st.dataframe(preview_df, use_container_width=True)
+                            st.info(f"📊 Showing the first {len(preview_df)} rows of {len(preview_df.columns)} columns ({uploaded_file.size / (1024 * 1024):.1f} MB file)")
                     except pd.errors.EmptyDataError:
                         st.warning("⚠️ The CSV file contains no data or has no columns.")
                     except pd.errors.ParserError as pe:
                         st.warning(f"⚠️ Error parsing CSV file: {str(pe)}")
-                        
-                # Reset file pointer for final upload
-                uploaded_file.seek(0)
             except Exception as e:
                 st.warning(f"⚠️ Could not preview file: {str(e)}")
         
@@ -746,8 +1140,7 @@ def show_upload_page():
                 
                 mapped_queue_type = queue_mapping[queue_type]
                 if handle_file_upload(uploaded_file, mapped_queue_type, project_title, priority):
-                    st.success(f"🎉 Project '{project_title}' uploaded successfully to {queue_type} queue!")
-                    time.sleep(2)
+                    flash(f"🎉 Project '{project_title}' uploaded successfully to {queue_type} queue!")
                     st.rerun()
             else:
                 st.error("❌ Please provide both project title and file")
@@ -764,117 +1157,100 @@ def show_analytics_page():
         
     show_back_button('analytics')
     st.header("📈 Analytics Dashboard")
-
-    # Refresh data to ensure we see latest changes from all users
-    refresh_session_state()
     
-    # Add refresh button
-    if st.button("🔄 Refresh Data", help="Refresh to see latest analytics data"):
-        refresh_session_state()
-        st.rerun()
+    # Add refresh and repair buttons
+    col_refresh, col_rebuild = st.columns([1, 4])
+    with col_refresh:
+        if st.button("🔄 Refresh Data", help="Refresh to see latest analytics data"):
+            refresh_session_state()
+            st.rerun()
+    with col_rebuild:
+        if st.button("🛠️ Rebuild Aggregates", help="Recompute the stored analytics and project summaries from the records"):
+            # The only action here that reads the records: each stored project at its current version
+            cache = get_dataset_cache()
+            for file_key in storage.list_projects():
+                df = cache.get(file_key, storage.project_version(file_key), storage.load_project)
+                if df is not None:
+                    save_project_meta(file_key, df)
+            st.success("✅ Analytics aggregates rebuilt")
+
+    # Stored per-project aggregates, summaries and memory reports are kept up to date on every write,
+    # so the page is drawn from project metadata alone
+    try:
+        all_meta = storage.load_all_project_meta()
+    except Exception as e:
+        st.error(f"❌ Error loading analytics aggregates: {e}")
+        all_meta = {}
 
     # Collect all project data for analytics
     all_projects = []
     detailed_analytics = []
+    memory_rows = []
     
-    for file_key, df in st.session_state.uploaded_files.items():
+    for file_key, meta in all_meta.items():
         parts = file_key.split('_')
         if len(parts) < 2:
             continue
             
         queue_type = parts[0]
         project_name = parts[1]
-        uploader = df['uploader'].iloc[0] if 'uploader' in df.columns else "Unknown"
+        
+        if summary_row(meta) is None or not meta.get('memory'):
+            # Projects stored before the aggregates, summary or memory report existed get them built once
+            df = st.session_state.uploaded_files.get(file_key)
+            if df is None:
+                df = storage.load_project(file_key)
+            if df is None:
+                continue
+            meta = save_project_meta(file_key, df)
+        summary = summary_row(meta)
+        stats = meta['aggregates']
+        uploader = summary['uploader']
+        
+        # Memory footprint recorded when the project was last saved
+        memory = meta['memory']
+        memory_rows.append({
+            "Project": project_name,
+            "Records": summary['total'],
+            "Stored (MB)": round(memory['compact_bytes'] / (1024 * 1024), 2),
+            "As Plain Objects (MB)": round(memory['object_bytes'] / (1024 * 1024), 2),
+            "Saved": f"{(1 - memory['compact_bytes'] / memory['object_bytes']) * 100:.1f}%" if memory['object_bytes'] else "0.0%",
+        })
         
         # Basic project stats
-        total_records = len(df)
-        reviewed = len(df[df['status'] == 'Reviewed'])
-        gmv = get_gmv_sum(df)
+        total_records = stats['total_records']
+        reviewed = stats['total_reviewed']
+        gmv = stats['total_gmv']
         
         # Advanced FIDO Analytics for reviewed items only
-        reviewed_df = df[df['status'] == 'Reviewed']
-        total_reviewed = len(reviewed_df)
-        
-        if total_reviewed > 0:
-            # GMV calculations
-            beginning_gmv = get_gmv_sum(reviewed_df)  # Total GMV of reviewed FIDOs
-            
-            # Calculate various update counts
-            total_updated = 0
-            category_only_updated = 0
-            brand_only_updated = 0
-            both_updated = 0
-            no_updates = 0
-            description_updated = 0
-            
-            # GMV breakdowns
-            category_only_gmv = 0
-            brand_only_gmv = 0
-            both_updated_gmv = 0
-            no_updates_gmv = 0
-            
-            # Special movements
-            brand_id_null_moved = 0
-            false_positive_moved = 0
-            
-            for _, row in reviewed_df.iterrows():
-                row_gmv = get_gmv_value(row, list(reviewed_df.columns))
-                
-                # Check if category was updated
-                category_changed = (str(row.get('CATEGORY', '')) != str(row.get('updated_category', '')))
-                
-                # Check if brand was updated
-                brand_changed = (str(row.get('BRAND', '')) != str(row.get('updated_brand', '')))
-                
-                # Check if description was updated
-                desc_changed = (str(row.get('DESCRIPTION', '')) != str(row.get('updated_description', '')))
-                
-                # Check if marked as no change
-                no_change = row.get('no_change', False)
-                
-                # Count updates
-                if not no_change and (category_changed or brand_changed or desc_changed):
-                    total_updated += 1
-                
-                if desc_changed:
-                    description_updated += 1
-                
-                # Categorize update types
-                if category_changed and brand_changed:
-                    both_updated += 1
-                    both_updated_gmv += row_gmv
-                elif category_changed and not brand_changed:
-                    category_only_updated += 1
-                    category_only_gmv += row_gmv
-                elif brand_changed and not category_changed:
-                    brand_only_updated += 1
-                    brand_only_gmv += row_gmv
-                else:
-                    no_updates += 1
-                    no_updates_gmv += row_gmv
-                
-                # Special cases
-                if str(row.get('BRAND_ID', '')).lower() in ['null', 'none', '']:
-                    brand_id_null_moved += 1
-                
-                # Check for false positive (simplified - could be enhanced with more logic)
-                if 'false' in str(row.get('comments', '')).lower() and 'positive' in str(row.get('comments', '')).lower():
-                    false_positive_moved += 1
-            
-            # Calculate ending GMV and changes
-            removed_gmv = 0  # Simplified - would need more complex logic to determine removed FIDOs
-            added_gmv_null = 0  # Simplified
-            added_gmv_false_pos = 0  # Simplified
-            added_fido_gmv = 0  # Simplified
-            ending_gmv = beginning_gmv  # Simplified
-            net_change_gmv = ending_gmv - beginning_gmv
-        else:
-            # No reviews completed yet
-            beginning_gmv = removed_gmv = added_gmv_null = added_gmv_false_pos = 0
-            added_fido_gmv = ending_gmv = net_change_gmv = 0
-            total_updated = category_only_updated = brand_only_updated = both_updated = no_updates = 0
-            category_only_gmv = brand_only_gmv = both_updated_gmv = no_updates_gmv = 0
-            description_updated = brand_id_null_moved = false_positive_moved = 0
+        total_reviewed = stats['total_reviewed']
+        beginning_gmv = stats['beginning_gmv']  # Total GMV of reviewed FIDOs
+        
+        # Update counts
+        total_updated = stats['total_updated']
+        category_only_updated = stats['category_only_updated']
+        brand_only_updated = stats['brand_only_updated']
+        both_updated = stats['both_updated']
+        no_updates = stats['no_updates']
+        description_updated = stats['description_updated']
+        
+        # GMV breakdowns
+        category_only_gmv = stats['category_only_gmv']
+        brand_only_gmv = stats['brand_only_gmv']
+        both_updated_gmv = stats['both_updated_gmv']
+        no_updates_gmv = stats['no_updates_gmv']
+        
+        # Special movements
+        brand_id_null_moved = stats['brand_id_null_moved']
+        false_positive_moved = stats['false_positive_moved']
+        
+        # Calculate ending GMV and changes
+        removed_gmv = 0  # Simplified - would need more complex logic to determine removed FIDOs
+        added_gmv_null = 0  # Simplified
+        added_gmv_false_pos = 0  # Simplified
+        added_fido_gmv = 0  # Simplified
+        ending_gmv = beginning_gmv  # Simplified
+        net_change_gmv = ending_gmv - beginning_gmv
         
         # Percentages
         pct_total_updated = (total_updated / total_reviewed * 100) if total_reviewed > 0 else 0
@@ -1165,47 +1541,405 @@ def show_analytics_page():
         for queue, gmv in queue_gmv.items():
             percentage = (gmv / total_gmv * 100) if total_gmv > 0 else 0
             st.write(f"**{queue.title()}**: ${gmv:,.2f} ({percentage:.1f}%)")
+    
+    # Memory saved by the compact dtypes
+    with st.expander("🗜️ Memory Footprint by Project", expanded=False):
+        st.dataframe(pd.DataFrame(memory_rows), use_container_width=True, hide_index=True)
 
-# Enhanced reviewer interface showing all FIDOs
-def show_reviewer_page(queue_type):
-    if not st.session_state.selected_project:
-        show_project_selection_page(queue_type)
+# Function to work out the values a FIDO's review editor starts with
+def review_editor_defaults(row):
+    """The current updated values of a row, falling back to the originals (a blank string for missing values)"""
+    def usable(value):
+        # Blank means "not set", as in conflicts.row_state
+        return not (pd.isna(value) or value in ('', 'nan'))
+
+    def current_or(column, original):
+        value = row.get(column, '')
+        if not usable(value):
+            value = original
+        return value if usable(value) else ''
+
+    no_change = row.get('no_change', False)
+    return {
+        'updated_description': current_or('updated_description', row.get('DESCRIPTION', '')),
+        'updated_category': current_or('updated_category', get_relevant_category(row.get('CATEGORY', ''))),
+        'updated_brand': current_or('updated_brand', row.get('BRAND', '')),
+        'comments': current_or('comments', ''),
+        'no_change': False if pd.isna(no_change) else bool(no_change),
+    }
+
+# Function to validate an editor's values and queue the review
+def submit_review(file_key, row_label, fido_id, row, edits, expected_row):
+    """Check ``edits`` (updated_description/category/brand, comments, no_change) against the
+    original row, as the review cards do, and queue the review. Returns True if it was queued.
+    """
+    def original(value):
+        return '' if pd.isna(value) else value
+
+    changes_made = (
+        edits['updated_description'] != original(row.get('DESCRIPTION', ''))
+        or edits['updated_category'] != original(get_relevant_category(row.get('CATEGORY', '')))
+        or edits['updated_brand'] != original(row.get('BRAND', ''))
+        or edits['comments'].strip() != ''
+    )
+    if changes_made and edits['no_change']:
+        st.error("❌ You cannot make changes to the FIDO data AND select 'No Change Required'. Please either make changes OR select 'No Change Required', but not both.")
+        return False
+    if not changes_made and not edits['no_change']:
+        st.error("❌ Please make changes to the FIDO data OR check 'No Change Required' before submitting.")
+        return False
+
+    df = st.session_state.uploaded_files[file_key]
+    review_fields = {
+        **edits,
+        'status': 'Reviewed',
+        'reviewer': st.session_state.current_user['name'],
+        'review_date': datetime.now().strftime("%Y-%m-%d"),
+    }
+    try:
+        # Track how this row moves between analytics buckets
+        reviewed_row = df.loc[[row_label]].copy()
+        for column, value in review_fields.items():
+            set_cell(reviewed_row, row_label, column, value)
+        stats_delta = review_stats_delta(compute_review_stats(df.loc[[row_label]]), compute_review_stats(reviewed_row))
+    except Exception as e:
+        st.error(f"❌ Error updating row: {e}")
+        return False
+    return record_review(file_key, row_label, fido_id, review_fields, stats_delta, expected_row)
+
+# Function to draw one FIDO's review editor in the reviewer list
+def show_review_form(idx, fido_id, row):
+    """Review editor for one card, inside its own form.
+
+    Typing in a form does not rerun the script; only the submit button does,
+    so editing a card no longer reloads, filters and redraws the whole list
+    on every change. The submit is handled by ``show_review_card``.
+    """
+    defaults = review_editor_defaults(row)
+    # Enter in a field does not submit a half-finished review
+    with st.form(key=f"review_form_{idx}_{fido_id}", border=False, enter_to_submit=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.text_area(
+                "📝 Updated Description",
+                value=defaults['updated_description'],
+                key=f"desc_{idx}_{fido_id}",
+                height=100
+            )
+            st.text_input(
+                "📦 Updated Category",
+                value=defaults['updated_category'],
+                key=f"cat_{idx}_{fido_id}"
+            )
+        with col2:
+            st.text_input(
+                "🏷️ Updated Brand",
+                value=defaults['updated_brand'],
+                key=f"brand_{idx}_{fido_id}"
+            )
+            st.text_input(
+                "💬 Comments",
+                value=defaults['comments'],
+                key=f"comment_{idx}_{fido_id}"
+            )
+        
+        col_check, col_submit = st.columns([1, 1])
+        with col_check:
+            st.checkbox(
+                "✅ No Change Required",
+                value=defaults['no_change'],
+                key=f"nochange_{idx}_{fido_id}"
+            )
+        with col_submit:
+            st.form_submit_button(
+                "💾 Update Review" if row['status'] == 'Reviewed' else "✅ Submit Review",
+                type="primary",
+                key=f"submit_{idx}_{fido_id}",
+                use_container_width=True
+            )
+
+# Widget key prefix of each review field in a card's form
+REVIEW_FORM_FIELDS = {
+    'updated_description': 'desc',
+    'updated_category': 'cat',
+    'updated_brand': 'brand',
+    'no_change': 'nochange',
+    'comments': 'comment',
+}
+
+# Function to draw the reviewer page's progress counters
+def show_review_progress(box, file_key):
+    """Draw save status, progress metrics and bar into box (an st.empty), replacing what it showed"""
+    with box.container():
+        # May reload the project if a review was refused, so it runs before the counts
+        show_save_status()
+        df = st.session_state.uploaded_files[file_key]
+        reviewed = int((df['status'] == 'Reviewed').sum())
+        remaining = int((df['status'] == 'Pending Review').sum())
+        total = len(df)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Records", total)
+        with col2:
+            st.metric("Reviewed", reviewed)
+        with col3:
+            st.metric("Remaining", remaining)
+        with col4:
+            st.metric("Progress", f"{(reviewed / total * 100):.1f}%" if total > 0 else "0%")
+        st.progress(reviewed / total if total > 0 else 0)
+    st.session_state.review_progress_drawn = True
+
+# Function to draw one FIDO card of the reviewer list
+@st.fragment
+def show_review_card(file_key, row_label, idx, progress_box):
+    """One FIDO's card and review form, as a fragment.
+
+    Submitting the form reruns only this card: the review is queued, the card
+    is drawn with its new state and the progress counters are redrawn into
+    progress_box, while the rest of the page stays as it is.
+    """
+    df = st.session_state.uploaded_files.get(file_key)
+    if df is None or row_label not in df.index:
         return
+    row = df.loc[row_label]
+    fido_id = row.get('FIDO', f'record_{idx}')
+    # Review state of the row as last shown to this reviewer; a submit is checked against it
+    shown_states = st.session_state.review_row_states['rows']
+    expected_row = shown_states.get(row_label, row_state(row))
+    
+    # The form's values are in session state before its widgets are drawn, so the card below shows the result
+    if st.session_state.get(f"submit_{idx}_{fido_id}"):
+        edits = {column: st.session_state[f"{prefix}_{idx}_{fido_id}"] for column, prefix in REVIEW_FORM_FIELDS.items()}
+        if submit_review(file_key, row_label, fido_id, row, edits, expected_row):
+            verb = "updated" if row['status'] == 'Reviewed' else "submitted"
+            st.toast(f"✅ Review {verb} for FIDO {fido_id}!")
+            # The review went into this session's own copy, which may have replaced df
+            row = st.session_state.uploaded_files[file_key].loc[row_label]
+            show_review_progress(progress_box, file_key)
+    shown_states[row_label] = row_state(row)
+    status_class = 'status-reviewed' if row['status'] == 'Reviewed' else 'status-pending'
+    
+    # Create shareable link
+    share_url = f"?fido={fido_id}"
     
-    show_back_button('reviewer')
-    
-    # Refresh data to ensure we see latest changes from all users
-    refresh_session_state()
+    st.markdown(f"""
+        <div class="fido-card" id="fido-{fido_id}">
+            <div class="fido-header">
+                <h4 class="fido-title">📝 FIDO: {fido_id}</h4>
+                <div class="share-link" onclick="copyToClipboard('{share_url}', 'FIDO {fido_id}')">
+                    🔗 Share
+                </div>
+            </div>
+            <div class="fido-content">
+                <div>
+                    <div class="fido-field"><strong>UPC:</strong><span>{row.get('BARCODE', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Brand ID:</strong><span>{row.get('BRAND_ID', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Original Brand:</strong><span>{row.get('BRAND', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>GMV:</strong><span>${get_project_gmv(file_key)['values'].at[row_label]:,.2f}</span></div>
+                </div>
+                <div>
+                    <div class="fido-field"><strong>Original Category:</strong><span>{row.get('CATEGORY', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Original Description:</strong><span>{row.get('DESCRIPTION', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Status:</strong><span class="fido-status {status_class}">{row['status']}</span></div>""" + (f"""
+                    <div class="fido-field"><strong>Reviewer:</strong><span>{str(row.get("reviewer", ""))}</span></div>""" if row.get('reviewer') else "") + """
+                </div>
+            </div>""" + (f"""
+            <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid var(--border-color);">
+                <h5 style="margin: 0 0 0.5rem 0; color: var(--text-primary); font-weight: 600;">📋 Updated Information:</h5>
+                <div class="fido-content">
+                    <div>
+                        <div class="fido-field"><strong>Updated Brand:</strong><span>{row.get('updated_brand', 'N/A')}</span></div>
+                        <div class="fido-field"><strong>Updated Category:</strong><span>{row.get('updated_category', 'N/A')}</span></div>
+                    </div>
+                    <div>
+                        <div class="fido-field"><strong>Updated Description:</strong><span>{row.get('updated_description', 'N/A')}</span></div>
+                        <div class="fido-field"><strong>Comments:</strong><span>{row.get('comments', 'N/A')}</span></div>
+                    </div>
+                </div>
+                <div class="fido-field"><strong>No Change Required:</strong><span>{'Yes' if pd.notna(row.get('no_change')) and row.get('no_change') else 'No'}</span></div>
+                <div class="fido-field"><strong>Review Date:</strong><span>{row.get('review_date', 'N/A')}</span></div>
+            </div>""" if row['status'] == 'Reviewed' else "") + """
+        </div>
+    """, unsafe_allow_html=True)
     
-    # Get project data
-    file_key = st.session_state.selected_project
-    if file_key not in st.session_state.uploaded_files:
-        st.error("❌ Project not found. It may have been deleted.")
-        if st.button("← Back to Projects"):
-            navigate_to(queue_type)
+    # Review form for pending items OR editing reviewed items
+    if row['status'] == 'Reviewed':
+        # For reviewed items, use an expander to keep interface clean
+        with st.expander("🔽 Edit Review", expanded=False):
+            show_review_form(idx, fido_id, row)
+    elif row['status'] == 'Pending Review':
+        # For pending reviews, show form directly
+        st.markdown('<div class="review-actions">', unsafe_allow_html=True)
+        show_review_form(idx, fido_id, row)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+# Function to keep focus mode's queue of pending FIDOs and its prefetched rows
+def load_focus_queue(file_key, df):
+    """Return the session's focus-mode state for a project, with the rows around the current one prefetched.
+
+    The pending row labels are collected once, when focus mode starts; after
+    that, moving between FIDOs only reads the next ``FOCUS_PREFETCH`` rows by
+    label, so it never scans or renders the whole project.
+    """
+    focus = st.session_state.get('focus_queue')
+    if focus is None or focus['file_key'] != file_key:
+        # Backends with a status index answer this without scanning the DataFrame
+        labels = storage.find_rows(file_key, status='Pending Review')
+        if labels is None:
+            labels = df.index[df['status'] == 'Pending Review']
+        focus = {'file_key': file_key, 'labels': list(labels), 'position': 0, 'rows': {}, 'version': None}
+        st.session_state.focus_queue = focus
+
+    version = st.session_state.get('project_versions', {}).get(file_key)
+    if focus['version'] != version:
+        # The stored project changed since the rows were read; read them again
+        focus['rows'], focus['version'] = {}, version
+    window = [
+        label for label in focus['labels'][max(0, focus['position'] - 1):focus['position'] + FOCUS_PREFETCH]
+        if label not in focus['rows']
+    ]
+    window = [label for label in window if label in df.index]
+    if window:
+        focus['rows'].update(df.loc[window].to_dict('index'))
+    return focus
+
+def move_focus(delta):
+    """Step focus mode to the next (delta 1) or previous (delta -1) FIDO (runs as a button callback)"""
+    focus = st.session_state.focus_queue
+    focus['position'] = min(max(0, focus['position'] + delta), len(focus['labels']))
+    # Going forward passes over FIDOs someone has reviewed meanwhile; going back shows them
+    focus['skip_reviewed'] = delta > 0
+
+def reset_focus_queue():
+    """Collect the project's pending FIDOs again on the next run (runs as a button callback)"""
+    st.session_state.pop('focus_queue', None)
+
+# Function to review one pending FIDO at a time
+def show_focus_mode(file_key, df):
+    """Single-FIDO review with keyboard shortcuts, fed from the prefetched focus queue"""
+    focus = load_focus_queue(file_key, df)
+    while focus['position'] < len(focus['labels']):
+        label = focus['labels'][focus['position']]
+        row = focus['rows'].get(label)
+        if row is None and label in df.index:
+            focus = load_focus_queue(file_key, df)
+            row = focus['rows'].get(label)
+        if row is not None and not (focus.get('skip_reviewed') and row['status'] == 'Reviewed'):
+            break
+        focus['position'] += 1
+        focus = load_focus_queue(file_key, df)
+
+    remaining = len(focus['labels']) - focus['position']
+    st.caption(f"🎯 FIDO {min(focus['position'] + 1, len(focus['labels']))} of {len(focus['labels'])} in your queue · "
+               "Ctrl+Enter submit · Alt+N no change · Alt+↓ next · Alt+↑ previous")
+    if remaining <= 0:
+        st.success("🎉 You have reached the end of the pending FIDOs in this queue.")
+        col_prev, col_reload = st.columns(2)
+        with col_prev:
+            st.button("◀ Previous", key="focus_prev", on_click=move_focus, args=(-1,),
+                      disabled=not focus['labels'], shortcut="Alt+Up", use_container_width=True)
+        with col_reload:
+            st.button("🔄 Reload Pending FIDOs", key="focus_reload", on_click=reset_focus_queue, use_container_width=True)
+        return
+
+    label = focus['labels'][focus['position']]
+    row = focus['rows'][label]
+    fido_id = row.get('FIDO', f'record_{label}')
+    # The row as prefetched is what this reviewer is looking at; a submit is checked against it
+    expected_row = row_state(row)
+    row_gmv = get_project_gmv(file_key)['values']
+
+    st.markdown(f"""
+        <div class="fido-card" id="fido-{fido_id}">
+            <div class="fido-header">
+                <h4 class="fido-title">📝 FIDO: {fido_id}</h4>
+            </div>
+            <div class="fido-content">
+                <div>
+                    <div class="fido-field"><strong>UPC:</strong><span>{row.get('BARCODE', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Brand ID:</strong><span>{row.get('BRAND_ID', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Original Brand:</strong><span>{row.get('BRAND', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>GMV:</strong><span>${row_gmv.at[label]:,.2f}</span></div>
+                </div>
+                <div>
+                    <div class="fido-field"><strong>Original Category:</strong><span>{row.get('CATEGORY', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Original Description:</strong><span>{row.get('DESCRIPTION', 'N/A')}</span></div>
+                    <div class="fido-field"><strong>Status:</strong><span class="fido-status {'status-reviewed' if row['status'] == 'Reviewed' else 'status-pending'}">{row['status']}</span></div>
+                </div>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    defaults = review_editor_defaults(row)
+    # Keyed by row so every FIDO starts from its own values; only Ctrl+Enter (not Enter in a field) submits
+    with st.form(key=f"focus_form_{label}", border=False, enter_to_submit=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            updated_desc = st.text_area("📝 Updated Description", value=defaults['updated_description'], height=100)
+            updated_cat = st.text_input("📦 Updated Category", value=defaults['updated_category'])
+        with col2:
+            updated_brand = st.text_input("🏷️ Updated Brand", value=defaults['updated_brand'])
+            comments = st.text_input("💬 Comments", value=defaults['comments'])
+        no_change = st.checkbox("✅ No Change Required", value=defaults['no_change'])
+
+        col_submit, col_no_change = st.columns(2)
+        with col_submit:
+            submitted = st.form_submit_button(
+                "✅ Submit Review" if row['status'] == 'Pending Review' else "💾 Update Review",
+                type="primary", shortcut="Ctrl+Enter", use_container_width=True
+            )
+        with col_no_change:
+            no_change_clicked = st.form_submit_button("✅ No Change Required", shortcut="Alt+N", use_container_width=True)
+
+    if submitted or no_change_clicked:
+        if no_change_clicked:
+            # Nothing changes, so the updated values are the originals
+            edits = {
+                'updated_description': row.get('DESCRIPTION', ''),
+                'updated_category': get_relevant_category(row.get('CATEGORY', '')),
+                'updated_brand': row.get('BRAND', ''),
+            }
+            edits = {column: '' if pd.isna(value) else value for column, value in edits.items()}
+            edits.update(comments='', no_change=True)
+        else:
+            edits = {
+                'updated_description': updated_desc,
+                'updated_category': updated_cat,
+                'updated_brand': updated_brand,
+                'comments': comments,
+                'no_change': no_change,
+            }
+        if submit_review(file_key, label, fido_id, row, edits, expected_row):
+            # Show our own review if the reviewer steps back to this FIDO
+            focus['rows'][label] = {**row, **edits, 'status': 'Reviewed', 'reviewer': st.session_state.current_user['name']}
+            move_focus(1)
+            flash(f"✅ Review submitted for FIDO {fido_id}!", "toast")
+            st.rerun()
+
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        st.button("◀ Previous", key="focus_prev", on_click=move_focus, args=(-1,),
+                  disabled=focus['position'] == 0, shortcut="Alt+Up", use_container_width=True)
+    with col_next:
+        st.button("Skip ▶", key="focus_next", on_click=move_focus, args=(1,),
+                  shortcut="Alt+Down", use_container_width=True)
+
+def change_review_page(delta, total_pages):
+    """Move the reviewer list by delta pages (runs as a button callback)"""
+    current = st.session_state.get('review_page', 1)
+    st.session_state.review_page = min(max(1, current + delta), total_pages)
+
+# Function to draw the reviewer's filtered, paginated FIDO list
+@st.fragment
+def show_review_list(file_key, progress_box):
+    """Filters, bulk review, the page's FIDO cards and page navigation, as a fragment.
+
+    Changing a filter or page reruns only the list, not the whole app; each
+    card is a fragment of its own inside it.
+    """
+    df = st.session_state.uploaded_files.get(file_key)
+    if df is None:
         return
-        
-    df = st.session_state.uploaded_files[file_key]
-    project_name = file_key.split('_')[1]
-    
-    st.header(f"🔍 Reviewing: {project_name}")
-    
-    # Progress indicator
-    pending = df[df['status'] == 'Pending Review']
-    reviewed = len(df[df['status'] == 'Reviewed'])
-    total = len(df)
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Records", total)
-    with col2:
-        st.metric("Reviewed", reviewed)
-    with col3:
-        st.metric("Remaining", len(pending))
-    with col4:
-        st.metric("Progress", f"{(reviewed / total * 100):.1f}%" if total > 0 else "0%")
-    
-    st.progress(reviewed / total if total > 0 else 0)
     
     # Filter options
     col1, col2 = st.columns([1, 1])
@@ -1222,350 +1956,172 @@ def show_reviewer_page(queue_type):
             key="search_filter"
         )
     
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters (each filter returns a new frame, so no full copy is needed)
+    filtered_df = df
     if filter_status != "All":
-        filtered_df = filtered_df[filtered_df['status'] == filter_status]
+        # Backends with a status index answer this without scanning the DataFrame
+        status_rows = storage.find_rows(file_key, status=filter_status)
+        if status_rows is None:
+            filtered_df = filtered_df[filtered_df['status'] == filter_status]
+        else:
+            filtered_df = filtered_df.loc[filtered_df.index.intersection(status_rows, sort=False)]
     
     if search_term:
-        search_columns = ['FIDO', 'BARCODE', 'BRAND', 'CATEGORY', 'DESCRIPTION']
-        mask = pd.Series([False] * len(filtered_df), index=filtered_df.index)
-        
-        for col in search_columns:
-            if col in filtered_df.columns:
-                mask |= filtered_df[col].astype(str).str.contains(search_term, case=False, na=False)
-            
-        filtered_df = filtered_df[mask]
+        # Answered from the project's search index instead of scanning every column
+        matches = pd.Series(get_search_index(file_key).search(search_term), index=df.index)
+        filtered_df = filtered_df[matches.loc[filtered_df.index].to_numpy()]
     
-    st.markdown(f"**Showing {len(filtered_df)} of {total} records**")
+    st.markdown(f"**Showing {len(filtered_df)} of {len(df)} records**")
     
     if filtered_df.empty:
         st.info("No records match your current filters.")
         return
     
-    # Show all FIDOs
-    for idx, (_, row) in enumerate(filtered_df.iterrows()):
-        fido_id = row.get('FIDO', f'record_{idx}')
-        status_class = 'status-reviewed' if row['status'] == 'Reviewed' else 'status-pending'
-        
-        # Create shareable link
-        share_url = f"?fido={fido_id}"
+    # Paginate so each rerun only builds cards and widgets for the visible slice
+    col_size, col_page, col_range = st.columns([1, 1, 2])
+    with col_size:
+        page_size = st.selectbox(
+            "Records per page:",
+            REVIEW_PAGE_SIZES,
+            index=1,
+            key="review_page_size"
+        )
+    total_pages = max(1, math.ceil(len(filtered_df) / page_size))
+    
+    # Go back to the first page whenever the project, filters or page size change
+    page_signature = (file_key, filter_status, search_term, page_size)
+    if st.session_state.get('review_page_signature') != page_signature:
+        st.session_state.review_page_signature = page_signature
+        st.session_state.review_page = 1
+    elif st.session_state.get('review_page', 1) > total_pages:
+        st.session_state.review_page = total_pages
+    
+    with col_page:
+        page = st.number_input(
+            f"Page (of {total_pages}):",
+            min_value=1,
+            max_value=total_pages,
+            step=1,
+            key="review_page"
+        )
+    
+    page_start = (page - 1) * page_size
+    page_df = filtered_df.iloc[page_start:page_start + page_size]
+    with col_range:
+        st.markdown(f"**Records {page_start + 1}–{page_start + len(page_df)} of {len(filtered_df)}**")
+    
+    # One decision for many FIDOs at once
+    # Only pending rows are reviewed in bulk by filter, so existing reviews are never overwritten unseen
+    pending_df = filtered_df[(filtered_df['status'] == 'Pending Review').to_numpy()]
+    with st.expander(f"⚡ Bulk Review ({len(pending_df)} pending matching records)", expanded=False):
+        bulk_scope = st.radio(
+            "Apply to:",
+            ["All pending records matching the filters", "Selected FIDOs on this page"],
+            horizontal=True,
+            key="bulk_scope"
+        )
+        if bulk_scope == "Selected FIDOs on this page":
+            fido_labels = page_df['FIDO'] if 'FIDO' in page_df.columns else pd.Series(page_df.index, index=page_df.index)
+            bulk_rows = st.multiselect(
+                "FIDOs:",
+                list(page_df.index),
+                format_func=lambda label: str(fido_labels.at[label]),
+                key=f"bulk_selection_{page}"
+            )
+            reviewed = int((page_df.loc[bulk_rows, 'status'] == 'Reviewed').sum())
+            if reviewed:
+                st.warning(f"⚠️ {reviewed} of the selected FIDOs {'is' if reviewed == 1 else 'are'} already reviewed; applying replaces {'its' if reviewed == 1 else 'their'} review.")
+        else:
+            bulk_rows = list(pending_df.index)
         
-        st.markdown(f"""
-            <div class="fido-card" id="fido-{fido_id}">
-                <div class="fido-header">
-                    <h4 class="fido-title">📝 FIDO: {fido_id}</h4>
-                    <div class="share-link" onclick="copyToClipboard('{share_url}', 'FIDO {fido_id}')">
-                        🔗 Share
-                    </div>
-                </div>
-                <div class="fido-content">
-                    <div>
-                        <div class="fido-field"><strong>UPC:</strong><span>{row.get('BARCODE', 'N/A')}</span></div>
-                        <div class="fido-field"><strong>Brand ID:</strong><span>{row.get('BRAND_ID', 'N/A')}</span></div>
-                        <div class="fido-field"><strong>Original Brand:</strong><span>{row.get('BRAND', 'N/A')}</span></div>
-                        <div class="fido-field"><strong>GMV:</strong><span>${get_gmv_value(row, list(filtered_df.columns)):,.2f}</span></div>
-                    </div>
-                    <div>
-                        <div class="fido-field"><strong>Original Category:</strong><span>{row.get('CATEGORY', 'N/A')}</span></div>
-                        <div class="fido-field"><strong>Original Description:</strong><span>{row.get('DESCRIPTION', 'N/A')}</span></div>
-                        <div class="fido-field"><strong>Status:</strong><span class="fido-status {status_class}">{row['status']}</span></div>""" + (f"""
-                        <div class="fido-field"><strong>Reviewer:</strong><span>{str(row.get("reviewer", ""))}</span></div>""" if row.get('reviewer') else "") + """
-                    </div>
-                </div>""" + (f"""
-                <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid var(--border-color);">
-                    <h5 style="margin: 0 0 0.5rem 0; color: var(--text-primary); font-weight: 600;">📋 Updated Information:</h5>
-                    <div class="fido-content">
-                        <div>
-                            <div class="fido-field"><strong>Updated Brand:</strong><span>{row.get('updated_brand', 'N/A')}</span></div>
-                            <div class="fido-field"><strong>Updated Category:</strong><span>{row.get('updated_category', 'N/A')}</span></div>
-                        </div>
-                        <div>
-                            <div class="fido-field"><strong>Updated Description:</strong><span>{row.get('updated_description', 'N/A')}</span></div>
-                            <div class="fido-field"><strong>Comments:</strong><span>{row.get('comments', 'N/A')}</span></div>
-                        </div>
-                    </div>
-                    <div class="fido-field"><strong>No Change Required:</strong><span>{'Yes' if row.get('no_change') else 'No'}</span></div>
-                    <div class="fido-field"><strong>Review Date:</strong><span>{row.get('review_date', 'N/A')}</span></div>
-                </div>""" if row['status'] == 'Reviewed' else "") + """
-            </div>
-        """, unsafe_allow_html=True)
+        bulk_actions = {
+            "✅ No Change Required": 'no_change',
+            "🏷️ Set Updated Brand": 'brand',
+            "📦 Set Updated Category": 'category',
+        }
+        bulk_action = bulk_actions[st.selectbox("Decision:", list(bulk_actions), key="bulk_action")]
+        bulk_value = None
+        if bulk_action != 'no_change':
+            bulk_value = st.text_input("New value:", key="bulk_value").strip()
+        
+        if st.button(f"⚡ Apply to {len(bulk_rows)} FIDO{'s' if len(bulk_rows) != 1 else ''}", type="primary", key="bulk_apply", disabled=not bulk_rows):
+            if bulk_action != 'no_change' and not bulk_value:
+                st.error("❌ Please enter the new value to apply.")
+            else:
+                stored = apply_bulk_review(file_key, bulk_rows, bulk_action, bulk_value)
+                if stored:
+                    flash(f"✅ Bulk review saved for {stored} FIDO{'s' if stored != 1 else ''}!")
+                    st.rerun()
+    
+    # Review state of each row as last shown to this reviewer; a submit is checked against it
+    if st.session_state.get('review_row_states', {}).get('file_key') != file_key:
+        st.session_state.review_row_states = {'file_key': file_key, 'rows': {}}
+    
+    # Show the FIDOs on this page
+    for idx, row_label in enumerate(page_df.index, start=page_start):
+        show_review_card(file_key, row_label, idx, progress_box)
+    
+    # Page navigation
+    col_prev, col_page_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button(
+            "◀ Previous",
+            key="review_prev_page",
+            disabled=page <= 1,
+            on_click=change_review_page,
+            args=(-1, total_pages),
+            use_container_width=True
+        )
+    with col_page_info:
+        st.markdown(f"<div style='text-align: center;'>Page {page} of {total_pages}</div>", unsafe_allow_html=True)
+    with col_next:
+        st.button(
+            "Next ▶",
+            key="review_next_page",
+            disabled=page >= total_pages,
+            on_click=change_review_page,
+            args=(1, total_pages),
+            use_container_width=True
+        )
+
+# Enhanced reviewer interface showing all FIDOs
+def show_reviewer_page(queue_type):
+    if not st.session_state.selected_project:
+        show_project_selection_page(queue_type)
+        return
+    
+    show_back_button('reviewer')
+    
+    # Refresh data to ensure we see latest changes from all users
+    refresh_session_state()
+    
+    # Get project data
+    file_key = st.session_state.selected_project
+    if file_key not in st.session_state.uploaded_files:
+        st.error("❌ Project not found. It may have been deleted.")
+        if st.button("← Back to Projects"):
+            navigate_to(queue_type)
+        return
         
-        # Review form for pending items OR editing reviewed items
-        if row['status'] == 'Pending Review' or row['status'] == 'Reviewed':
-            with st.container():
-                # For reviewed items, use an expander to keep interface clean
-                if row['status'] == 'Reviewed':
-                    with st.expander("🔽 Edit Review", expanded=False):
-                        col1, col2 = st.columns(2)
-                        
-                        # Pre-populate with existing updated values if available, handle NaN/None values
-                        current_updated_desc = row.get('updated_description', '')
-                        if pd.isna(current_updated_desc) or current_updated_desc == 'nan':
-                            current_updated_desc = row.get('DESCRIPTION', '')
-                            if pd.isna(current_updated_desc) or current_updated_desc == 'nan':
-                                current_updated_desc = ''
-                        
-                        current_updated_cat = row.get('updated_category', '')
-                        if pd.isna(current_updated_cat) or current_updated_cat == 'nan':
-                            current_updated_cat = get_relevant_category(row.get('CATEGORY', ''))
-                            if pd.isna(current_updated_cat) or current_updated_cat == 'nan':
-                                current_updated_cat = ''
-                        
-                        current_updated_brand = row.get('updated_brand', '')
-                        if pd.isna(current_updated_brand) or current_updated_brand == 'nan':
-                            current_updated_brand = row.get('BRAND', '')
-                            if pd.isna(current_updated_brand) or current_updated_brand == 'nan':
-                                current_updated_brand = ''
-                        
-                        current_comments = row.get('comments', '')
-                        if pd.isna(current_comments) or current_comments == 'nan':
-                            current_comments = ''
-                        
-                        current_no_change = row.get('no_change', False)
-                        if pd.isna(current_no_change):
-                            current_no_change = False
-                        
-                        with col1:
-                            updated_desc = st.text_area(
-                                "📝 Updated Description",
-                                value=current_updated_desc,
-                                key=f"desc_{idx}_{fido_id}",
-                                height=100
-                            )
-                            
-                            updated_cat = st.text_input(
-                                "📦 Updated Category",
-                                value=current_updated_cat,
-                                key=f"cat_{idx}_{fido_id}"
-                            )
-                        
-                        with col2:
-                            updated_brand = st.text_input(
-                                "🏷️ Updated Brand",
-                                value=current_updated_brand,
-                                key=f"brand_{idx}_{fido_id}"
-                            )
-                            
-                            comments = st.text_input(
-                                "💬 Comments",
-                                value=current_comments,
-                                key=f"comment_{idx}_{fido_id}"
-                            )
-                        
-                        col_check, col_submit = st.columns([1, 1])
-                        with col_check:
-                            no_change = st.checkbox(
-                                "✅ No Change Required", 
-                                value=current_no_change,
-                                key=f"nochange_{idx}_{fido_id}"
-                            )
-                        
-                        with col_submit:
-                            button_text = "💾 Update Review"
-                            if st.button(
-                                button_text, 
-                                type="primary", 
-                                key=f"submit_{idx}_{fido_id}",
-                                use_container_width=True
-                            ):
-                                # Check if user made changes to the data
-                                original_desc = row.get('DESCRIPTION', '')
-                                original_cat = get_relevant_category(row.get('CATEGORY', ''))
-                                original_brand = row.get('BRAND', '')
-                                
-                                desc_changed = updated_desc != original_desc
-                                cat_changed = updated_cat != original_cat
-                                brand_changed = updated_brand != original_brand
-                                has_comments = comments.strip() != ''
-                                
-                                changes_made = desc_changed or cat_changed or brand_changed or has_comments
-                                
-                                # Validation: Prevent conflicting selections
-                                if changes_made and no_change:
-                                    st.error("❌ You cannot make changes to the FIDO data AND select 'No Change Required'. Please either make changes OR select 'No Change Required', but not both.")
-                                    st.stop()
-                                
-                                # Validation: Must make changes OR select no change
-                                if not changes_made and not no_change:
-                                    st.error("❌ Please make changes to the FIDO data OR check 'No Change Required' before submitting.")
-                                    st.stop()
-                                
-                                # Update the dataframe
-                                try:
-                                    # Find the correct row index
-                                    if 'FIDO' in df.columns:
-                                        row_mask = df['FIDO'] == fido_id
-                                        matching_rows = df[row_mask]
-                                        if not matching_rows.empty:
-                                            actual_idx = matching_rows.index[0]
-                                        else:
-                                            # Fallback to using the enumeration index
-                                            actual_idx = df.index[idx]
-                                    else:
-                                        actual_idx = df.index[idx]
-                                    
-                                    # DON'T update the original columns - keep them as-is
-                                    # Only store in updated columns for tracking changes
-                                    df.at[actual_idx, 'updated_description'] = updated_desc
-                                    df.at[actual_idx, 'updated_category'] = updated_cat
-                                    df.at[actual_idx, 'updated_brand'] = updated_brand
-                                    df.at[actual_idx, 'no_change'] = no_change
-                                    df.at[actual_idx, 'comments'] = comments
-                                    df.at[actual_idx, 'status'] = 'Reviewed'
-                                    df.at[actual_idx, 'reviewer'] = st.session_state.current_user['name']
-                                    df.at[actual_idx, 'review_date'] = datetime.now().strftime("%Y-%m-%d")
-                                    
-                                except Exception as e:
-                                    st.error(f"❌ Error updating row: {e}")
-                                    continue
-                                
-                                st.session_state.uploaded_files[file_key] = df
-                                save_session_state()
-                                
-                                # Refresh to ensure immediate visibility across users
-                                refresh_session_state()
-                                
-                                st.success(f"✅ Review updated for FIDO {fido_id}!")
-                                time.sleep(1)
-                                st.rerun()
-                else:
-                    # For pending reviews, show form directly
-                    st.markdown('<div class="review-actions">', unsafe_allow_html=True)
-                    col1, col2 = st.columns(2)
-                    
-                    # Pre-populate with existing updated values if available, handle NaN/None values
-                    current_updated_desc = row.get('updated_description', '')
-                    if pd.isna(current_updated_desc) or current_updated_desc == 'nan':
-                        current_updated_desc = row.get('DESCRIPTION', '')
-                        if pd.isna(current_updated_desc) or current_updated_desc == 'nan':
-                            current_updated_desc = ''
-                    
-                    current_updated_cat = row.get('updated_category', '')
-                    if pd.isna(current_updated_cat) or current_updated_cat == 'nan':
-                        current_updated_cat = get_relevant_category(row.get('CATEGORY', ''))
-                        if pd.isna(current_updated_cat) or current_updated_cat == 'nan':
-                            current_updated_cat = ''
-                    
-                    current_updated_brand = row.get('updated_brand', '')
-                    if pd.isna(current_updated_brand) or current_updated_brand == 'nan':
-                        current_updated_brand = row.get('BRAND', '')
-                        if pd.isna(current_updated_brand) or current_updated_brand == 'nan':
-                            current_updated_brand = ''
-                    
-                    current_comments = row.get('comments', '')
-                    if pd.isna(current_comments) or current_comments == 'nan':
-                        current_comments = ''
-                    
-                    current_no_change = row.get('no_change', False)
-                    if pd.isna(current_no_change):
-                        current_no_change = False
-                    
-                    with col1:
-                        updated_desc = st.text_area(
-                            "📝 Updated Description",
-                            value=current_updated_desc,
-                            key=f"desc_{idx}_{fido_id}",
-                            height=100
-                        )
-                        
-                        updated_cat = st.text_input(
-                            "📦 Updated Category",
-                            value=current_updated_cat,
-                            key=f"cat_{idx}_{fido_id}"
-                        )
-                    
-                    with col2:
-                        updated_brand = st.text_input(
-                            "🏷️ Updated Brand",
-                            value=current_updated_brand,
-                            key=f"brand_{idx}_{fido_id}"
-                        )
-                        
-                        comments = st.text_input(
-                            "💬 Comments",
-                            value=current_comments,
-                            key=f"comment_{idx}_{fido_id}"
-                        )
-                    
-                    col_check, col_submit = st.columns([1, 1])
-                    with col_check:
-                        no_change = st.checkbox(
-                            "✅ No Change Required", 
-                            value=current_no_change,
-                            key=f"nochange_{idx}_{fido_id}"
-                        )
-                    
-                    with col_submit:
-                        button_text = "✅ Submit Review"
-                        if st.button(
-                            button_text, 
-                            type="primary", 
-                            key=f"submit_{idx}_{fido_id}",
-                            use_container_width=True
-                        ):
-                            # Check if user made changes to the data
-                            original_desc = row.get('DESCRIPTION', '')
-                            original_cat = get_relevant_category(row.get('CATEGORY', ''))
-                            original_brand = row.get('BRAND', '')
-                            
-                            desc_changed = updated_desc != original_desc
-                            cat_changed = updated_cat != original_cat
-                            brand_changed = updated_brand != original_brand
-                            has_comments = comments.strip() != ''
-                            
-                            changes_made = desc_changed or cat_changed or brand_changed or has_comments
-                            
-                            # Validation: Prevent conflicting selections
-                            if changes_made and no_change:
-                                st.error("❌ You cannot make changes to the FIDO data AND select 'No Change Required'. Please either make changes OR select 'No Change Required', but not both.")
-                                st.stop()
-                            
-                            # Validation: Must make changes OR select no change
-                            if not changes_made and not no_change:
-                                st.error("❌ Please make changes to the FIDO data OR check 'No Change Required' before submitting.")
-                                st.stop()
-                            
-                            # Update the dataframe
-                            try:
-                                # Find the correct row index
-                                if 'FIDO' in df.columns:
-                                    row_mask = df['FIDO'] == fido_id
-                                    matching_rows = df[row_mask]
-                                    if not matching_rows.empty:
-                                        actual_idx = matching_rows.index[0]
-                                    else:
-                                        # Fallback to using the enumeration index
-                                        actual_idx = df.index[idx]
-                                else:
-                                    actual_idx = df.index[idx]
-                                
-                                # DON'T update the original columns - keep them as-is
-                                # Only store in updated columns for tracking changes
-                                df.at[actual_idx, 'updated_description'] = updated_desc
-                                df.at[actual_idx, 'updated_category'] = updated_cat
-                                df.at[actual_idx, 'updated_brand'] = updated_brand
-                                df.at[actual_idx, 'no_change'] = no_change
-                                df.at[actual_idx, 'comments'] = comments
-                                df.at[actual_idx, 'status'] = 'Reviewed'
-                                df.at[actual_idx, 'reviewer'] = st.session_state.current_user['name']
-                                df.at[actual_idx, 'review_date'] = datetime.now().strftime("%Y-%m-%d")
-                                
-                            except Exception as e:
-                                st.error(f"❌ Error updating row: {e}")
-                                continue
-                            
-                            st.session_state.uploaded_files[file_key] = df
-                            save_session_state()
-                            
-                            # Refresh to ensure immediate visibility across users
-                            refresh_session_state()
-                            
-                            st.success(f"✅ Review submitted for FIDO {fido_id}!")
-                            time.sleep(1)
-                            st.rerun()
-                    
-                    st.markdown('</div>', unsafe_allow_html=True)
+    df = st.session_state.uploaded_files[file_key]
+    project_name = file_key.split('_')[1]
+    
+    st.header(f"🔍 Reviewing: {project_name}")
+    
+    # Progress indicator; a card that takes a submit redraws it in place
+    progress_box = st.empty()
+    
+    # One pending FIDO at a time instead of the filtered list
+    if st.toggle("🎯 Focus Mode", key="focus_mode", help="Review pending FIDOs one at a time with keyboard shortcuts"):
+        show_review_progress(progress_box, file_key)
+        show_focus_mode(file_key, df)
+        return
+    
+    # Drawn after the list, unless a card already drew it with its submit counted
+    st.session_state.review_progress_drawn = False
+    show_review_list(file_key, progress_box)
+    if not st.session_state.review_progress_drawn:
+        show_review_progress(progress_box, file_key)
     
     # Download section
     st.markdown("---")
@@ -1582,7 +2138,7 @@ def show_reviewer_page(queue_type):
             )
     
     with col2:
-        if reviewed > 0:
+        if (df['status'] == 'Reviewed').any():
             reviewed_df = df[df['status'] == 'Reviewed']
             csv_reviewed = reviewed_df.to_csv(index=False).encode('utf-8')
             st.download_button(
@@ -1597,9 +2153,6 @@ def show_project_selection_page(queue_type):
     show_back_button(f"selection_{queue_type}")
     st.header(f"📂 {queue_type.title()} Projects")
     
-    # Refresh data to ensure we see latest changes from all users
-    refresh_session_state()
-    
     # Add refresh button and search bar for manual updates
     col_refresh, col_search, col_info = st.columns([1, 2, 2])
     with col_refresh:
@@ -1624,11 +2177,8 @@ def show_project_selection_page(queue_type):
     
     # Filter files for this queue type - show ALL projects to ALL users
     # Fixed: Only show projects that exactly match the queue type (category)
-    queue_files = {}
-    for k, v in st.session_state.uploaded_files.items():
-        parts = k.split('_')
-        if len(parts) > 0 and parts[0] == queue_type:
-            queue_files[k] = v
+    # Cards come from the stored summary index, which every write keeps current
+    queue_files = load_project_summaries(queue_type)
     
     if not queue_files:
         st.info(f"📭 No projects available in {queue_type} queue")
@@ -1639,7 +2189,7 @@ def show_project_selection_page(queue_type):
     
     # Group by project
     projects = {}
-    for k, df in queue_files.items():
+    for k, summary in queue_files.items():
         parts = k.split('_')
         project_name = parts[1]
         priority = parts[2] if len(parts) > 3 else 'medium'
@@ -1654,19 +2204,8 @@ def show_project_selection_page(queue_type):
         except (ValueError, IndexError):
             fallback_date = "Unknown"
         
-        # Use actual upload_date from dataframe if available, otherwise use fallback
-        if 'upload_date' in df.columns and not df['upload_date'].empty:
-            formatted_date = df['upload_date'].iloc[0]
-        else:
-            formatted_date = fallback_date
-        
-        # Ensure claim columns exist
-        if 'claimed_by' not in df.columns:
-            df['claimed_by'] = ''
-        if 'claimed_date' not in df.columns:
-            df['claimed_date'] = ''
-        if 'project_status' not in df.columns:
-            df['project_status'] = 'Available'
+        # Use actual upload_date from the project if available, otherwise use fallback
+        formatted_date = summary['upload_date'] or fallback_date
         
         if project_name not in projects:
             projects[project_name] = {
@@ -1675,17 +2214,17 @@ def show_project_selection_page(queue_type):
                 'total': 0,
                 'reviewed': 0,
                 'gmv': 0,
-                'uploader': df['uploader'].iloc[0] if 'uploader' in df.columns else "Unknown",
+                'uploader': summary['uploader'],
                 'date': formatted_date,
-                'claimed_by': df['claimed_by'].iloc[0] if 'claimed_by' in df.columns and not df['claimed_by'].iloc[0] == '' else None,
-                'claimed_date': df['claimed_date'].iloc[0] if 'claimed_date' in df.columns and not df['claimed_date'].iloc[0] == '' else None,
-                'project_status': df['project_status'].iloc[0] if 'project_status' in df.columns else 'Available'
+                'claimed_by': summary['claimed_by'],
+                'claimed_date': summary['claimed_date'],
+                'project_status': summary['project_status']
             }
         
-        projects[project_name]['files'].append((k, df))
-        projects[project_name]['total'] += len(df)
-        projects[project_name]['reviewed'] += len(df[df['status'] == 'Reviewed'])
-        projects[project_name]['gmv'] += get_gmv_sum(df)
+        projects[project_name]['files'].append(k)
+        projects[project_name]['total'] += summary['total']
+        projects[project_name]['reviewed'] += summary['reviewed']
+        projects[project_name]['gmv'] += summary['gmv']
 
     # Display projects in modern cards
     cols = st.columns(2)
@@ -1754,30 +2293,37 @@ def show_project_selection_page(queue_type):
             with col_action1:
                 if st.button("🔍 Review", key=f"review_{project_name}", use_container_width=True):
                     # Automatically claim the project when reviewing
+                    # Pick up other reviewers' changes first so the claim does not overwrite them
+                    refresh_session_state()
                     current_date = datetime.now().strftime("%Y-%m-%d")
-                    for file_key, df in data['files']:
+                    claimed_keys = [file_key for file_key in data['files'] if file_key in st.session_state.uploaded_files]
+                    for file_key in claimed_keys:
+                        df = editable_project(file_key)
                         df['claimed_by'] = st.session_state.current_user['name']
                         df['claimed_date'] = current_date
                         df['project_status'] = 'Claimed'
-                        st.session_state.uploaded_files[file_key] = df
-                    save_session_state()
+                    conflicts = save_session_state(claimed_keys)
                     refresh_session_state()
                     
-                    st.session_state.selected_project = data['files'][0][0]  # First file key
-                    navigate_to(f"{queue_type}_review")
+                    if conflicts:
+                        st.warning(f"⚠️ '{project_name}' was changed by another user while you were claiming it. The latest version is loaded; please click Review again.")
+                    else:
+                        st.session_state.selected_project = data['files'][0]  # First file key
+                        navigate_to(f"{queue_type}_review")
             
             with col_action2:
-                # Download option
-                first_file = data['files'][0][1]
-                csv = first_file.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    "📥 Download",
-                    data=csv,
-                    file_name=f"{project_name}.csv",
-                    mime="text/csv",
-                    key=f"download_{project_name}",
-                    use_container_width=True
-                )
+                # The export needs the project's full data, so it is only built when asked for
+                if st.button("📥 Download", key=f"download_{project_name}", use_container_width=True):
+                    first_key = data['files'][0]
+                    csv = get_project_csv(first_key, storage.project_version(first_key))
+                    st.download_button(
+                        "Download CSV",
+                        data=csv,
+                        file_name=f"{project_name}.csv",
+                        mime="text/csv",
+                        key=f"download_file_{project_name}",
+                        use_container_width=True
+                    )
             
             # Admin delete button (also inside the card)
             if st.session_state.current_user['role'] == "Admin":
@@ -1798,12 +2344,7 @@ def show_project_selection_page(queue_type):
                 with col_confirm2:
                     if st.button("✅ Delete", key=f"confirm_btn_{project_name}", type="primary", use_container_width=True):
                         # Delete all files for this project
-                        for file_key, _ in data['files']:
-                            if file_key in st.session_state.uploaded_files:
-                                del st.session_state.uploaded_files[file_key]
-                        
-                        # Save the updated state
-                        save_session_state()
+                        delete_projects(data['files'])
                         
                         # Refresh to ensure immediate visibility across users
                         refresh_session_state()
@@ -1812,8 +2353,7 @@ def show_project_selection_page(queue_type):
                         if f"confirm_delete_{project_name}" in st.session_state:
                             del st.session_state[f"confirm_delete_{project_name}"]
                         
-                        st.success(f"✅ Project '{project_name}' deleted!")
-                        time.sleep(1)
+                        flash(f"✅ Project '{project_name}' deleted!")
                         st.rerun()
 
 def main():
@@ -1830,479 +2370,8 @@ def main():
     if 'theme_mode' not in st.session_state:
         st.session_state.theme_mode = 'light'  # Default to light mode (original purple theme)
 
-    # Add custom CSS for modern styling with theme support
-    st.markdown(f"""
-        <style>
-        /* Import modern font */
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-        
-        /* Global styles */
-        .stApp {{
-            font-family: 'Inter', sans-serif;
-            background: linear-gradient(135deg, var(--bg-primary) 0%, var(--bg-secondary) 100%);
-            min-height: 100vh;
-            transition: all 0.3s ease;
-        }}
-        
-        /* CSS Variables for theming */
-        :root {{
-            /* Light theme (default) */
-            --bg-primary: #667eea;
-            --bg-secondary: #764ba2;
-            --card-bg: rgba(255, 255, 255, 0.1);
-            --card-hover-bg: rgba(255, 255, 255, 0.15);
-            --text-primary: #ffffff;
-            --text-secondary: #ffffff;
-            --text-muted: #e2e8f0;
-            --border-color: rgba(255, 255, 255, 0.2);
-            --input-bg: rgba(255, 255, 255, 0.7);
-            --input-focus-bg: rgba(255, 255, 255, 0.9);
-            --input-text-color: #1a202c;
-            --header-text-color: #ffffff;
-        }}
-        
-        /* Global fallback to ensure text is ALWAYS visible - emergency override */
-        body, html, .stApp, .main, .block-container, div, span, p, h1, h2, h3, h4, h5, h6, label, a, li {{
-            color: #ffffff !important;
-        }}
-        
-        /* Streamlit specific emergency text visibility */
-        .stMarkdown, .stMarkdown *, [data-testid="stMarkdownContainer"], [data-testid="stMarkdownContainer"] * {{
-            color: #ffffff !important;
-        }}
-        
-        [data-theme="dark"] {{
-            /* Dark theme */
-            --bg-primary: #1a1a2e;
-            --bg-secondary: #16213e;
-            --card-bg: rgba(30, 30, 50, 0.8);
-            --card-hover-bg: rgba(30, 30, 50, 0.9);
-            --text-primary: #ffffff;
-            --text-secondary: #e2e8f0;
-            --text-muted: #a0aec0;
-            --border-color: rgba(255, 255, 255, 0.1);
-            --input-bg: rgba(20, 20, 30, 0.8);
-            --input-focus-bg: rgba(20, 20, 30, 0.9);
-            --input-text-color: #ffffff;
-            --header-text-color: #ffffff;
-        }}
-        
-        /* Alternative selector for dark theme */
-        .theme-dark {{
-            --bg-primary: #1a1a2e;
-            --bg-secondary: #16213e;
-            --card-bg: rgba(30, 30, 50, 0.8);
-            --card-hover-bg: rgba(30, 30, 50, 0.9);
-            --text-primary: #ffffff;
-            --text-secondary: #e2e8f0;
-            --text-muted: #a0aec0;
-            --border-color: rgba(255, 255, 255, 0.1);
-            --input-bg: rgba(20, 20, 30, 0.8);
-            --input-focus-bg: rgba(20, 20, 30, 0.9);
-            --input-text-color: #ffffff;
-            --header-text-color: #ffffff;
-        }}
-        
-        /* Center the main title */
-        .main-title {{
-            text-align: center;
-            color: var(--header-text-color);
-            font-size: 2.5rem;
-            font-weight: 700;
-            margin-bottom: 2rem;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }}
-        
-        /* Theme toggle button */
-        .theme-toggle {{
-            position: fixed;
-            top: 1rem;
-            right: 1rem;
-            z-index: 1000;
-            background: var(--card-bg);
-            border: 1px solid var(--border-color);
-            border-radius: 50px;
-            padding: 0.5rem 1rem;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            font-size: 1.2rem;
-            backdrop-filter: blur(10px);
-            -webkit-backdrop-filter: blur(10px);
-        }}
-        
-        .theme-toggle:hover {{
-            background: var(--card-hover-bg);
-            transform: scale(1.05);
-        }}
-        
-        /* Modern card styles */
-        .modern-card {{
-            background: var(--card-bg);
-            backdrop-filter: blur(20px);
-            -webkit-backdrop-filter: blur(20px);
-            border: 1px solid var(--border-color);
-            border-radius: 16px;
-            padding: 1.5rem;
-            margin-bottom: 1.5rem;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-            transition: all 0.3s ease;
-        }}
-        
-        .modern-card:hover {{
-            background: var(--card-hover-bg);
-            transform: translateY(-2px);
-            box-shadow: 0 12px 40px rgba(0, 0, 0, 0.15);
-        }}
-        
-        /* Stats cards */
-        .stats-card {{
-            background: var(--card-bg);
-            backdrop-filter: blur(20px);
-            -webkit-backdrop-filter: blur(20px);
-            border: 1px solid var(--border-color);
-            border-radius: 12px;
-            padding: 1.5rem;
-            text-align: center;
-            transition: all 0.3s ease;
-        }}
-        
-        .stats-card:hover {{
-            transform: translateY(-3px);
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.2);
-        }}
-        
-        .stats-number {{
-            font-size: 2rem;
-            font-weight: 700;
-            color: var(--text-primary);
-            margin-bottom: 0.5rem;
-        }}
-        
-        .stats-label {{
-            font-size: 0.9rem;
-            color: var(--text-secondary);
-            font-weight: 500;
-        }}
-        
-        /* FIDO review cards */
-        .fido-card {{
-            background: var(--card-bg);
-            backdrop-filter: blur(20px);
-            -webkit-backdrop-filter: blur(20px);
-            border: 1px solid var(--border-color);
-            border-radius: 12px;
-            padding: 1.5rem;
-            margin-bottom: 1.5rem;
-            transition: all 0.3s ease;
-        }}
-        
-        .fido-card:hover {{
-            background: var(--card-hover-bg);
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.15);
-        }}
-        
-        .fido-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1rem;
-            padding-bottom: 0.75rem;
-            border-bottom: 1px solid var(--border-color);
-        }}
-        
-        .fido-title {{
-            margin: 0;
-            color: var(--text-primary);
-            font-weight: 600;
-        }}
-        
-        .share-link {{
-            background: rgba(102, 126, 234, 0.2);
-            color: var(--text-primary);
-            padding: 0.5rem 1rem;
-            border-radius: 8px;
-            font-size: 0.85rem;
-            cursor: pointer;
-            transition: all 0.2s ease;
-            border: 1px solid rgba(102, 126, 234, 0.3);
-        }}
-        
-        .share-link:hover {{
-            background: rgba(102, 126, 234, 0.3);
-            transform: translateY(-1px);
-        }}
-        
-        .fido-content {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 1rem;
-        }}
-        
-        .fido-field {{
-            display: flex;
-            justify-content: space-between;
-            padding: 0.5rem 0;
-            border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        
-        .fido-field strong {{
-            color: var(--text-primary);
-            font-weight: 500;
-            margin-right: 1rem;
-        }}
-        
-        .fido-field span {{
-            color: var(--text-secondary);
-            text-align: right;
-            flex: 1;
-        }}
-        
-        .fido-status {{
-            padding: 0.25rem 0.75rem;
-            border-radius: 6px;
-            font-size: 0.8rem;
-            font-weight: 500;
-        }}
-        
-        .status-pending {{
-            background: rgba(249, 115, 22, 0.2);
-            color: #f97316;
-            border: 1px solid rgba(249, 115, 22, 0.3);
-        }}
-        
-        .status-reviewed {{
-            background: rgba(34, 197, 94, 0.2);
-            color: #22c55e;
-            border: 1px solid rgba(34, 197, 94, 0.3);
-        }}
-        
-        .review-actions {{
-            background: rgba(255, 255, 255, 0.05);
-            border-radius: 12px;
-            padding: 1.5rem;
-            margin-top: 1rem;
-            border: 1px solid var(--border-color);
-        }}
-        
-        /* Input styling - Fixed for all inputs including login */
-        .stTextInput > div > div > input,
-        .stTextArea > div > div > textarea,
-        .stSelectbox > div > div > div,
-        .stTextInput input,
-        .stTextArea textarea {{
-            background: var(--input-bg) !important;
-            border: 1px solid var(--border-color) !important;
-            border-radius: 8px !important;
-            color: var(--input-text-color) !important;
-        }}
-        
-        .stTextInput > div > div > input:focus,
-        .stTextArea > div > div > textarea:focus,
-        .stTextInput input:focus,
-        .stTextArea textarea:focus {{
-            background: var(--input-focus-bg) !important;
-            border-color: #667eea !important;
-            box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1) !important;
-            color: var(--input-text-color) !important;
-        }}
-        
-        /* Placeholder text styling */
-        .stTextInput > div > div > input::placeholder,
-        .stTextArea > div > div > textarea::placeholder,
-        .stTextInput input::placeholder,
-        .stTextArea textarea::placeholder {{
-            color: #718096 !important;
-            opacity: 0.7;
-        }}
-        
-        /* Button styling */
-        .stButton > button {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            border: none;
-            border-radius: 8px;
-            color: white;
-            font-weight: 500;
-            transition: all 0.3s ease;
-        }}
-        
-        .stButton > button:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
-        }}
-        
-        /* Sidebar styling */
-        .css-1d391kg {{
-            background: var(--card-bg);
-            backdrop-filter: blur(20px);
-            -webkit-backdrop-filter: blur(20px);
-        }}
-        
-        /* Hide Streamlit branding */
-        #MainMenu {{visibility: hidden;}}
-        footer {{visibility: hidden;}}
-        header {{visibility: hidden;}}
-        
-        /* Custom scrollbar */
-        ::-webkit-scrollbar {{
-            width: 8px;
-        }}
-        
-        ::-webkit-scrollbar-track {{
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 4px;
-        }}
-        
-        ::-webkit-scrollbar-thumb {{
-            background: rgba(255, 255, 255, 0.3);
-            border-radius: 4px;
-        }}
-        
-        ::-webkit-scrollbar-thumb:hover {{
-            background: rgba(255, 255, 255, 0.5);
-        }}
-        </style>
-    """, unsafe_allow_html=True)
-
-    # Apply current theme to document using CSS injection
-    theme_attr = 'dark' if st.session_state.theme_mode == 'dark' else 'light'
-    
-    # Inject theme-specific CSS directly
-    if st.session_state.theme_mode == 'dark':
-        st.markdown(f"""
-            <style>
-            /* Force dark theme styles */
-            .stApp {{
-                background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%) !important;
-            }}
-            .main .block-container {{
-                background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%) !important;
-            }}
-            /* Override any Streamlit default backgrounds */
-            .element-container, .stMarkdown, .stButton, .stSelectbox, .stTextInput {{
-                background: transparent !important;
-            }}
-            /* Comprehensive text visibility for dark mode - target ALL possible text elements */
-            .stApp, .stApp *, .main, .main *, .block-container, .block-container *,
-            .stMarkdown, .stMarkdown *, .stMarkdown p, .stMarkdown h1, .stMarkdown h2, .stMarkdown h3, .stMarkdown h4, .stMarkdown h5, .stMarkdown h6,
-            .stTextInput, .stTextInput *, .stTextArea, .stTextArea *, .stSelectbox, .stSelectbox *, .stButton, .stButton *,
-            .main-title, .stats-label, .stats-number, .fido-title, .fido-field, .fido-field strong, .fido-field span, 
-            .fido-status, .review-actions, .modern-card, .stats-card, .fido-card,
-            div, span, p, h1, h2, h3, h4, h5, h6, label, strong, em, a, li, ul, ol,
-            .css-1629p8f, .css-1y4p8pa, .css-1cpxqw2, .css-1v0mbdj, .css-1n76uvr,
-            [data-testid="stMarkdownContainer"], [data-testid="stText"], [data-testid="element-container"] {{
-                color: #ffffff !important;
-            }}
-            /* Login form specific targeting */
-            .stForm, .stForm *, [data-testid="stForm"], [data-testid="stForm"] * {{
-                color: #ffffff !important;
-            }}
-            /* Sidebar text */
-            .css-1d391kg, .css-1d391kg *, section[data-testid="stSidebar"], section[data-testid="stSidebar"] * {{
-                color: #ffffff !important;
-            }}
-            /* Input styling for dark mode */
-            .stTextInput > div > div > input,
-            .stTextArea > div > div > textarea,
-            .stSelectbox > div > div > div,
-            input, textarea, select {{
-                background: rgba(20, 20, 30, 0.8) !important;
-                border: 1px solid rgba(255, 255, 255, 0.1) !important;
-                border-radius: 8px !important;
-                color: #ffffff !important;
-            }}
-            /* Card backgrounds for dark mode */
-            .modern-card, .stats-card, .fido-card {{
-                background: rgba(30, 30, 50, 0.8) !important;
-                border: 1px solid rgba(255, 255, 255, 0.1) !important;
-                color: #ffffff !important;
-            }}
-            /* Button text visibility */
-            .stButton > button, button {{
-                color: #ffffff !important;
-            }}
-            /* Metric labels and values */
-            [data-testid="metric-container"], [data-testid="metric-container"] * {{
-                color: #ffffff !important;
-            }}
-            /* Ensure no black text anywhere */
-            * {{
-                color: #ffffff !important;
-            }}
-            </style>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
-            <style>
-            /* Force light theme styles */
-            .stApp {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-            }}
-            
-            .main .block-container {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-            }}
-            
-            /* Override any Streamlit default backgrounds */
-            .element-container, .stMarkdown, .stButton, .stSelectbox, .stTextInput {{
-                background: transparent !important;
-            }}
-            
-            /* Comprehensive text visibility for light mode - target ALL possible text elements */
-            .stApp, .stApp *, .main, .main *, .block-container, .block-container *,
-            .stMarkdown, .stMarkdown *, .stMarkdown p, .stMarkdown h1, .stMarkdown h2, .stMarkdown h3, .stMarkdown h4, .stMarkdown h5, .stMarkdown h6,
-            .stTextInput, .stTextInput *, .stTextArea, .stTextArea *, .stSelectbox, .stSelectbox *, .stButton, .stButton *,
-            .main-title, .stats-label, .stats-number, .fido-title, .fido-field, .fido-field strong, .fido-field span, 
-            .fido-status, .review-actions, .modern-card, .stats-card, .fido-card,
-            div, span, p, h1, h2, h3, h4, h5, h6, label, strong, em, a, li, ul, ol,
-            .css-1629p8f, .css-1y4p8pa, .css-1cpxqw2, .css-1v0mbdj, .css-1n76uvr,
-            [data-testid="stMarkdownContainer"], [data-testid="stText"], [data-testid="element-container"] {{
-                color: #ffffff !important;
-            }}
-            
-            /* Login form specific targeting */
-            .stForm, .stForm *, [data-testid="stForm"], [data-testid="stForm"] * {{
-                color: #ffffff !important;
-            }}
-            
-            /* Sidebar text */
-            .css-1d391kg, .css-1d391kg *, section[data-testid="stSidebar"], section[data-testid="stSidebar"] * {{
-                color: #ffffff !important;
-            }}
-            
-            /* Input styling for light mode */
-            .stTextInput > div > div > input,
-            .stTextArea > div > div > textarea,
-            .stSelectbox > div > div > div,
-            input, textarea, select {{
-                background: rgba(255, 255, 255, 0.7) !important;
-                border: 1px solid rgba(255, 255, 255, 0.2) !important;
-                border-radius: 8px !important;
-                color: #1a202c !important;
-            }}
-            
-            /* Card backgrounds for light mode */
-            .modern-card, .stats-card, .fido-card {{
-                background: rgba(255, 255, 255, 0.1) !important;
-                border: 1px solid rgba(255, 255, 255, 0.2) !important;
-                color: #ffffff !important;
-            }}
-            
-            /* Button text visibility */
-            .stButton > button, button {{
-                color: #ffffff !important;
-            }}
-            
-            /* Metric labels and values */
-            [data-testid="metric-container"], [data-testid="metric-container"] * {{
-                color: #ffffff !important;
-            }}
-            
-            /* Ensure all text is white in light mode */
-            * {{
-                color: #ffffff !important;
-            }}
-            </style>
-        """, unsafe_allow_html=True)
+    # Theme stylesheet from src/static/css, read and minified once per theme
+    st.markdown(get_theme_css(st.session_state.theme_mode), unsafe_allow_html=True)
 
     # Initialize session state
     if 'uploaded_files' not in st.session_state:
@@ -2314,23 +2383,6 @@ def main():
         # This prevents losing data during normal navigation
         pass
 
-    # Ensure all existing projects have claim columns (but don't save immediately)
-    needs_update = False
-    for file_key, df in st.session_state.uploaded_files.items():
-        if 'claimed_by' not in df.columns:
-            df['claimed_by'] = ''
-            needs_update = True
-        if 'claimed_date' not in df.columns:
-            df['claimed_date'] = ''
-            needs_update = True
-        if 'project_status' not in df.columns:
-            df['project_status'] = 'Available'
-            needs_update = True
-
-    # Only save if we actually made changes
-    if needs_update:
-        save_session_state()
-
     # Theme toggle button
     col_theme, col_spacer = st.columns([1, 10])
     with col_theme:
@@ -2359,9 +2411,26 @@ def main():
     query_params = st.query_params
     if 'fido' in query_params:
         st.session_state.highlighted_fido = query_params.get('fido')
+        if st.session_state.highlighted_fido != st.session_state.get('opened_fido_link'):
+            # A new shared link: open its record once the user is logged in
+            st.session_state.pending_fido = st.session_state.highlighted_fido
     elif 'highlighted_fido' not in st.session_state:
         st.session_state.highlighted_fido = None
 
+    if st.session_state.current_user and st.session_state.get('pending_fido'):
+        fido = st.session_state.pop('pending_fido')
+        st.session_state.opened_fido_link = fido
+        matches = find_records(fido)
+        if len(matches) == 1:
+            open_record(matches[0][0], fido)
+        else:
+            # None or several: let the user see the lookup results
+            st.session_state.lookup_value = fido
+            navigate_to('lookup')
+
+    # Messages from the action that triggered this rerun
+    show_flash_messages()
+
     # Main routing
     current_page = get_current_page()
 
@@ -2370,6 +2439,8 @@ def main():
             show_main_page()
         elif current_page == 'overview':
             show_overview_page()
+        elif current_page == 'lookup':
+            show_lookup_page()
         elif current_page == 'upload':
             show_upload_page()
         elif current_page == 'analytics':
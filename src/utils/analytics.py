@@ -0,0 +1,180 @@
+"""Per-project review analytics computed with vectorized pandas/NumPy masks.
+
+Matches the row-by-row rules the analytics page used to apply with
+``iterrows()``: values are compared as ``str()`` text, missing columns read as
+an empty string, and GMV comes from the first column with "gmv" in its name.
+"""
+import numpy as np
+import pandas as pd
+
+BRAND_ID_NULL_VALUES = ['null', 'none', '']
+
+
+def find_gmv_column(columns):
+    """Return the first column whose name contains 'gmv' (case insensitive)"""
+    for col in columns:
+        if 'gmv' in str(col).lower():
+            return col
+    return None
+
+
+def gmv_values(df):
+    """GMV of every row as float64, with non-numeric values counted as 0"""
+    gmv_col = find_gmv_column(df.columns)
+    if gmv_col is None:
+        return np.zeros(len(df), dtype=float)
+    values = df[gmv_col]
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        values = values.astype(object)
+    return pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype=float)
+
+
+def resolve_gmv(df):
+    """Resolve a project's GMV once: the source column, numeric GMV per row label and the total"""
+    values = pd.Series(gmv_values(df), index=df.index)
+    return {
+        'column': find_gmv_column(df.columns),
+        'values': values,
+        'total': float(values.sum()),
+    }
+
+
+def _as_text(df, column):
+    """str() of every value, or '' for every row when the column is missing"""
+    if column not in df.columns:
+        return np.full(len(df), '', dtype=object)
+    # Review columns repeat heavily, so convert each distinct value only once
+    values = df[column].to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values)
+    text = np.array([str(u) for u in uniques] + [''], dtype=object)[codes]
+    missing = codes == -1
+    if missing.any():
+        # NaN and None stringify differently, so keep them apart
+        text[missing] = [str(v) for v in values[missing]]
+    return text
+
+
+def _text_matches(text, predicate):
+    """Evaluate predicate once per distinct string and broadcast it to every row"""
+    codes, uniques = pd.factorize(text)
+    return np.array([predicate(u) for u in uniques] + [False], dtype=bool)[codes]
+
+
+def _truthy(df, column):
+    """bool() of every value, or False for every row when the column is missing"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    values = df[column]
+    if pd.api.types.is_bool_dtype(values.dtype):
+        # A missing nullable boolean used to be NaN, which is truthy
+        return values.fillna(True).to_numpy(dtype=bool)
+    values = values.to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values)
+    truthy = np.array([bool(u) for u in uniques] + [False], dtype=bool)[codes]
+    missing = codes == -1
+    if missing.any():
+        truthy[missing] = [bool(v) for v in values[missing]]
+    return truthy
+
+
+def _review_masks(reviewed_df):
+    """GMV of every reviewed row and the row masks behind each review counter"""
+    category_changed = _as_text(reviewed_df, 'CATEGORY') != _as_text(reviewed_df, 'updated_category')
+    brand_changed = _as_text(reviewed_df, 'BRAND') != _as_text(reviewed_df, 'updated_brand')
+    desc_changed = _as_text(reviewed_df, 'DESCRIPTION') != _as_text(reviewed_df, 'updated_description')
+    no_change = _truthy(reviewed_df, 'no_change')
+
+    masks = {
+        'total_reviewed': np.ones(len(reviewed_df), dtype=bool),
+        'total_updated': ~no_change & (category_changed | brand_changed | desc_changed),
+        'description_updated': desc_changed,
+        'category_only_updated': category_changed & ~brand_changed,
+        'brand_only_updated': brand_changed & ~category_changed,
+        'both_updated': category_changed & brand_changed,
+        'no_updates': ~category_changed & ~brand_changed,
+        'brand_id_null_moved': _text_matches(
+            _as_text(reviewed_df, 'BRAND_ID'),
+            lambda v: v.lower() in BRAND_ID_NULL_VALUES
+        ),
+        'false_positive_moved': _text_matches(
+            _as_text(reviewed_df, 'comments'),
+            lambda v: 'false' in v.lower() and 'positive' in v.lower()
+        ),
+    }
+    return gmv_values(reviewed_df), masks
+
+
+def compute_review_stats(df):
+    """Compute the update counters and GMV buckets for a project's reviewed rows"""
+    if 'status' in df.columns:
+        reviewed_df = df[df['status'] == 'Reviewed']
+    else:
+        reviewed_df = df.iloc[0:0]
+
+    gmv, masks = _review_masks(reviewed_df)
+    return {
+        'total_reviewed': len(reviewed_df),
+        'beginning_gmv': float(gmv.sum()),
+        'total_updated': int(masks['total_updated'].sum()),
+        'description_updated': int(masks['description_updated'].sum()),
+        'category_only_updated': int(masks['category_only_updated'].sum()),
+        'brand_only_updated': int(masks['brand_only_updated'].sum()),
+        'both_updated': int(masks['both_updated'].sum()),
+        'no_updates': int(masks['no_updates'].sum()),
+        'category_only_gmv': float(gmv[masks['category_only_updated']].sum()),
+        'brand_only_gmv': float(gmv[masks['brand_only_updated']].sum()),
+        'both_updated_gmv': float(gmv[masks['both_updated']].sum()),
+        'no_updates_gmv': float(gmv[masks['no_updates']].sum()),
+        'brand_id_null_moved': int(masks['brand_id_null_moved'].sum()),
+        'false_positive_moved': int(masks['false_positive_moved'].sum()),
+    }
+
+
+# GMV buckets and the counter whose rows they add up
+GMV_BUCKETS = {
+    'beginning_gmv': 'total_reviewed',
+    'category_only_gmv': 'category_only_updated',
+    'brand_only_gmv': 'brand_only_updated',
+    'both_updated_gmv': 'both_updated',
+    'no_updates_gmv': 'no_updates',
+}
+
+
+def _row_stats(df):
+    """Each row's share of compute_review_stats (zero for rows that are not reviewed), one column per counter"""
+    if 'status' in df.columns:
+        reviewed = (df['status'] == 'Reviewed').to_numpy(dtype=bool)
+    else:
+        reviewed = np.zeros(len(df), dtype=bool)
+
+    gmv, masks = _review_masks(df[reviewed])
+    stats = pd.DataFrame(0, index=df.index, columns=list(masks))
+    for counter, mask in masks.items():
+        stats.loc[reviewed, counter] = mask.astype(int)
+    for bucket, counter in GMV_BUCKETS.items():
+        stats[bucket] = 0.0
+        stats.loc[reviewed, bucket] = np.where(masks[counter], gmv, 0.0)
+    return stats
+
+
+def compute_project_aggregates(df):
+    """Full aggregate record for a project: review stats plus project totals"""
+    aggregates = compute_review_stats(df)
+    aggregates['total_records'] = len(df)
+    aggregates['total_gmv'] = float(gmv_values(df).sum())
+    return aggregates
+
+
+def review_stats_delta(before, after):
+    """Difference between a row's review stats after and before an edit"""
+    return {key: after[key] - before[key] for key in after if after[key] != before[key]}
+
+
+def review_stats_deltas(before, after):
+    """review_stats_delta of every row of an edit to many rows, as a list in row order.
+
+    ``before`` and ``after`` hold the same rows before and after the edit; each
+    row gets its own delta so a store can count exactly the reviews it accepts.
+    """
+    changes = _row_stats(after) - _row_stats(before)
+    return [{key: value for key, value in row.items() if value != 0} for row in changes.to_dict('records')]
@@ -0,0 +1,114 @@
+"""Arrow IPC storage for the read-only columns of a project snapshot.
+
+The columns that come from the upload (FIDO, BARCODE, BRAND, CATEGORY,
+DESCRIPTION, GMV, ...) never change once a project is stored. They are written
+once to an uncompressed Arrow IPC file and read back through a memory map, so
+every session and server process shares the same pages through the OS page
+cache. String columns with few distinct values are dictionary encoded. Review
+and claim columns, which change on every submit, are not handled here.
+
+pyarrow is optional. Without it ``available()`` is False and projects are
+stored as plain pickles.
+"""
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+# Columns written by reviews and claims; these are never put in the Arrow file
+REVIEW_COLUMNS = frozenset({
+    'status', 'reviewer', 'review_date', 'comments', 'no_change',
+    'updated_description', 'updated_category', 'updated_brand',
+    'claimed_by', 'claimed_date', 'project_status',
+})
+
+# String columns with at most this share of distinct values are dictionary encoded
+DICTIONARY_MAX_RATIO = 0.5
+
+BASE_ID_KEY = b'fido_base_id'
+
+
+def available():
+    """True when pyarrow is installed"""
+    return pa is not None
+
+
+def _to_arrow(series):
+    """Arrow array for a column that round-trips exactly, or None to leave it out"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or (
+        pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype)
+    ):
+        # NaN stays NaN rather than becoming null
+        return pa.array(series.to_numpy(), from_pandas=False)
+
+    # Missing strings would come back as None or <NA>, not NaN, so leave those columns out
+    if series.isna().any():
+        return None
+    if isinstance(dtype, pd.CategoricalDtype):
+        if not pd.api.types.is_string_dtype(dtype.categories.dtype):
+            return None
+        return pa.array(series, from_pandas=True)
+    if not pd.api.types.is_string_dtype(dtype):
+        return None
+    try:
+        array = pa.array(series.to_numpy(dtype=object), type=pa.large_string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed value types
+        return None
+    if len(series) and series.nunique() <= len(series) * DICTIONARY_MAX_RATIO:
+        array = array.dictionary_encode()
+    return array
+
+
+def split_frame(df):
+    """Return {column: Arrow array} for the read-only columns of df that can be stored as Arrow"""
+    if df.columns.has_duplicates:
+        return {}
+    base = {}
+    for column in df.columns:
+        if not isinstance(column, str) or column in REVIEW_COLUMNS:
+            continue
+        array = _to_arrow(df[column])
+        if array is not None:
+            base[column] = array
+    return base
+
+
+def write_base(path, arrays, base_id):
+    """Write {column: Arrow array} to an Arrow IPC file tagged with base_id"""
+    table = pa.Table.from_arrays(list(arrays.values()), names=list(arrays.keys()))
+    table = table.replace_schema_metadata({BASE_ID_KEY: base_id.encode()})
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _types_mapper(arrow_type):
+    # Keep strings in the mapped Arrow buffers instead of copying them into Python objects
+    if pa.types.is_large_string(arrow_type) or pa.types.is_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def read_base(path):
+    """Read an Arrow IPC base file through a memory map; returns (base_id, DataFrame)"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required to read columnar project snapshots")
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    base_id = (table.schema.metadata or {}).get(BASE_ID_KEY, b'').decode()
+    return base_id, table.to_pandas(types_mapper=_types_mapper, split_blocks=True, ignore_metadata=True)
@@ -0,0 +1,131 @@
+"""Compact dtypes for project DataFrames.
+
+CSV uploads come in as object columns where every row holds its own Python
+string, even for values such as BRAND, CATEGORY, status or the uploader that
+repeat on almost every row. ``compact_frame`` stores such columns as pandas
+Categoricals. A value then exists once per project, and each row keeps only a
+small integer code. GMV is kept as float64 and ``no_change`` as a nullable
+boolean.
+
+Categoricals reject values that are not among their categories, so writes
+go through ``set_cell`` and ``set_cells``.
+"""
+import sys
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Object columns with at most this share of distinct values become Categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Statuses a review can move a row to, kept as categories up front
+STATUS_VALUES = ['Pending Review', 'Reviewed']
+
+
+def _is_object_like(dtype):
+    return dtype == object or (pd.api.types.is_string_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype))
+
+
+def compact_frame(df):
+    """Return df with repeated strings as Categoricals, GMV as float64 and no_change as nullable boolean"""
+    df = df.copy(deep=False)
+    rows = len(df)
+    for column in df.columns:
+        values = df[column]
+        if column == 'GMV':
+            if values.dtype != 'float64':
+                df[column] = pd.to_numeric(values.astype(object), errors='coerce').fillna(0).astype('float64')
+        elif column == 'no_change':
+            if values.dtype != 'boolean':
+                try:
+                    df[column] = values.astype('boolean')
+                except (TypeError, ValueError):
+                    # Not plain True/False values; leave them alone
+                    pass
+        elif rows and _is_object_like(values.dtype) and values.nunique(dropna=False) <= rows * CATEGORY_MAX_RATIO:
+            try:
+                categorical = values.astype('category')
+            except TypeError:
+                # Mixed value types that cannot be ordered as categories
+                continue
+            if column == 'status':
+                missing = [s for s in STATUS_VALUES if s not in categorical.cat.categories]
+                categorical = categorical.cat.add_categories(missing)
+            df[column] = categorical
+    return df
+
+
+def compact_chunks(chunks):
+    """Give the chunks of one project the same compact dtypes, fixed from the first chunk.
+
+    Yields each chunk as it arrives. Columns the first chunk stores as
+    Categoricals are Categoricals in every chunk (``concat_chunks`` merges
+    their categories); the other columns are cast to the first chunk's dtype.
+    """
+    dtypes = None
+    for chunk in chunks:
+        if dtypes is None:
+            chunk = compact_frame(chunk)
+            dtypes = chunk.dtypes
+        else:
+            chunk = chunk.copy(deep=False)
+            for column, dtype in dtypes.items():
+                if column not in chunk.columns or chunk[column].dtype == dtype:
+                    continue
+                if isinstance(dtype, pd.CategoricalDtype):
+                    chunk[column] = chunk[column].astype('category')
+                    continue
+                try:
+                    chunk[column] = chunk[column].astype(dtype)
+                except (TypeError, ValueError):
+                    # Values the first chunk's dtype cannot hold; pd.concat widens the column instead
+                    pass
+        yield chunk
+
+
+def concat_chunks(chunks):
+    """Join chunks from compact_chunks into one DataFrame, keeping Categorical columns as Categoricals"""
+    df = pd.concat(chunks)
+    for column, dtype in chunks[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            # pd.concat only keeps Categoricals whose categories are identical
+            merged = union_categoricals([chunk[column] for chunk in chunks], ignore_order=True)
+            df[column] = pd.Categorical(merged, categories=merged.categories)
+    return df
+
+
+def set_cell(df, row_index, column, value):
+    """df.at[row_index, column] = value, adding value to a Categorical column's categories first"""
+    if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+        if not pd.isna(value) and value not in df[column].cat.categories:
+            df[column] = df[column].cat.add_categories([value])
+    df.at[row_index, column] = value
+
+
+def set_cells(df, row_indexes, column, values):
+    """df.loc[row_indexes, column] = values (a scalar or a Series), extending a Categorical's categories first"""
+    if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+        new = pd.Series(values).dropna().unique() if isinstance(values, pd.Series) else [values]
+        missing = [v for v in new if not pd.isna(v) and v not in df[column].cat.categories]
+        if missing:
+            df[column] = df[column].cat.add_categories(missing)
+    df.loc[row_indexes, column] = values
+
+
+def _object_bytes(values):
+    """Deep size the column would have as a plain object column with one Python object per row"""
+    counts = values.value_counts(dropna=False)
+    return len(values) * 8 + int(sum(sys.getsizeof(value) * count for value, count in counts.items()))
+
+
+def memory_report(df):
+    """Memory of df as stored and as plain object columns, in bytes"""
+    compact_bytes = int(df.memory_usage(deep=True, index=False).sum())
+    object_bytes = 0
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == 'boolean':
+            object_bytes += _object_bytes(values)
+        else:
+            object_bytes += int(values.memory_usage(deep=True, index=False))
+    return {'compact_bytes': compact_bytes, 'object_bytes': object_bytes}
@@ -0,0 +1,58 @@
+"""Optimistic concurrency checks for project writes.
+
+Reviewers work on their own in-memory copy of a project, so every write says
+which state it was based on and the store refuses it when that state is gone:
+
+- a whole-project save passes the version token of the copy it saves, and
+  fails if the stored project has moved on since;
+- a review submit passes the row's review fields as the reviewer saw them.
+  They act as the row's version: a submit is applied (and so merged with other
+  reviewers' submits to other rows) unless another reviewer has changed that
+  same row in the meantime.
+
+Both failures raise ``ConflictError`` and nothing is written.
+"""
+import pandas as pd
+
+# Review fields whose values make up a row's version
+ROW_STATE_COLUMNS = [
+    'status', 'reviewer', 'review_date', 'comments', 'no_change',
+    'updated_description', 'updated_category', 'updated_brand',
+]
+
+
+class ConflictError(Exception):
+    """A write was based on a project or row that another user has changed since"""
+
+    def __init__(self, message, current=None):
+        super().__init__(message)
+        # The row's review fields as now stored, for row conflicts
+        self.current = current or {}
+
+
+def _normalize(value):
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    value = str(value)
+    # Blank cells and NaN that went through astype(str) all mean "not set"
+    return None if value in ('', 'nan', '<NA>') else value
+
+
+def row_state(row):
+    """The review fields of a row (Series or dict) in comparable form"""
+    return {column: _normalize(row.get(column)) for column in ROW_STATE_COLUMNS}
+
+
+def check_row(fido, current_row, expected_state):
+    """Raise ConflictError if the row no longer has the review fields it had in expected_state"""
+    if expected_state is None:
+        return
+    current_state = row_state(current_row)
+    if any(current_state[column] != expected_state.get(column) for column in ROW_STATE_COLUMNS):
+        raise ConflictError(f"FIDO {fido} was changed by another user", current_state)
+
+
+def check_version(file_key, current_version, expected_version):
+    """Raise ConflictError if a project is no longer at expected_version (None skips the check)"""
+    if expected_version is not None and current_version != expected_version:
+        raise ConflictError(f"Project '{file_key}' was changed by another user")
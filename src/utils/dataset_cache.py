@@ -0,0 +1,105 @@
+"""Process-wide cache holding one copy of each project's DataFrame.
+
+Streamlit sessions share the cached DataFrames by reference instead of each
+loading their own copy. Entries are keyed by file_key and the storage version
+token, so a project is reloaded only after it has been written. A cached
+DataFrame is never changed in place: a session that edits a project works on
+an ``editable_copy``, which shares everything but the review columns.
+
+Values derived from a project (such as its resolved GMV) are cached next to it
+with ``derived`` and rebuilt only when the version or the DataFrame changes.
+"""
+import threading
+import weakref
+
+
+class DatasetCache:
+    """Thread-safe {file_key: (version, DataFrame)} map shared across sessions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load_locks = {}
+        self._derived = {}
+
+    def _load_lock(self, file_key):
+        with self._lock:
+            return self._load_locks.setdefault(file_key, threading.Lock())
+
+    def get(self, file_key, version, loader):
+        """Return the cached DataFrame for this version, calling loader(file_key) on a miss"""
+        with self._lock:
+            entry = self._entries.get(file_key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        # Only one session loads a given project; the others wait and reuse it
+        with self._load_lock(file_key):
+            with self._lock:
+                entry = self._entries.get(file_key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            df = loader(file_key)
+            if df is not None:
+                self.put(file_key, version, df)
+            return df
+
+    def put(self, file_key, version, df):
+        """Record df as the current copy of file_key at version"""
+        with self._lock:
+            self._entries[file_key] = (version, df)
+
+    def advance(self, file_key, version, new_version, apply):
+        """Move the copy cached at version to new_version by applying the write between them.
+
+        ``apply(df)`` returns a new DataFrame holding the write and leaves df as
+        it is, since sessions may still be showing it. The result is cached only
+        if the very DataFrame it was built from is still cached at version;
+        otherwise (the entry was reloaded, replaced or dropped meanwhile) the
+        project is invalidated and the next get() reads the stored copy.
+        """
+        with self._lock:
+            entry = self._entries.get(file_key)
+        if entry is None:
+            return
+        if entry[0] == version:
+            df = apply(entry[1])
+            with self._lock:
+                current = self._entries.get(file_key)
+                if current is not None and current[0] == version and current[1] is entry[1]:
+                    self._entries[file_key] = (new_version, df)
+                    # A write only changes review columns; values built from the others serve both copies
+                    for key, (derived_version, refs, value) in list(self._derived.items()):
+                        if key[0] == file_key and any(ref() is entry[1] for ref in refs):
+                            live = tuple(ref for ref in refs if ref() is not None)
+                            self._derived[key] = (derived_version, live + (weakref.ref(df),), value)
+                    return
+        self.invalidate(file_key)
+
+    def invalidate(self, file_key):
+        """Forget a project so the next get() reloads it from storage"""
+        with self._lock:
+            self._entries.pop(file_key, None)
+            for key in [key for key in self._derived if key[0] == file_key]:
+                del self._derived[key]
+
+    def derived(self, file_key, version, name, df, builder):
+        """Return builder(df), computed once per project version and DataFrame"""
+        with self._lock:
+            entry = self._derived.get((file_key, name))
+        if entry is not None and entry[0] == version and any(ref() is df for ref in entry[1]):
+            return entry[2]
+        value = builder(df)
+        with self._lock:
+            # Weak references, so a replaced DataFrame is not kept alive by its derived values
+            self._derived[(file_key, name)] = (version, (weakref.ref(df),), value)
+        return value
+
+
+def editable_copy(df, columns):
+    """A copy of df whose ``columns`` can be changed in place without touching df; the others stay shared"""
+    copy = df.copy(deep=False)
+    for column in columns:
+        if column in copy.columns:
+            copy[column] = copy[column].copy()
+    return copy
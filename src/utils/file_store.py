@@ -0,0 +1,572 @@
+"""File storage backend for uploaded FIDO review projects.
+
+Every project ``file_key`` lives in its own pickle under ``data/projects`` so a
+save only rewrites the project that changed and a load only reads the project
+that is needed.
+
+When pyarrow is installed the snapshot is split in two. The read-only upload
+columns go to an Arrow IPC file named after a random base id, which is
+memory-mapped on load (see ``columnar``). The pickle then holds only the review
+columns plus the base id it pairs with. A base file is never rewritten in place,
+so a reader always finds the one its pickle names.
+
+Review submissions are not written to the snapshot directly. Each one is
+appended to the project's journal (one JSON line per submit) and replayed on
+top of the snapshot when the project is loaded. Once a journal grows past
+``COMPACT_THRESHOLD_BYTES`` a background thread folds it into the snapshot.
+
+``project_version`` returns a cheap token built from the mtime and size of a
+project's files, so callers can skip reloading projects that have not changed.
+
+Small per-project metadata (such as the analytics aggregates and the summary
+shown on the project cards) is kept in a JSON side file next to the snapshot so
+it can be read without the DataFrame.
+
+Every file is replaced atomically (write to a temp file, fsync, ``os.replace``),
+and each project has a reader/writer lock file (see ``locks``): loads share it,
+while saves, review appends, compactions and deletes hold it alone. Metadata
+updates lock the metadata file. Several server processes can therefore share
+one data directory.
+"""
+import json
+import os
+import pickle
+import threading
+import uuid
+from datetime import datetime
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from . import columnar, locks
+from .compact import compact_frame, set_cells
+from .conflicts import ConflictError, check_row, check_version
+from .project_keys import parse_file_key
+
+STORAGE_DIR = "data"
+PROJECTS_DIR = os.path.join(STORAGE_DIR, "projects")
+PROJECT_SUFFIX = ".pkl"
+JOURNAL_SUFFIX = ".journal"
+COMPACTING_SUFFIX = ".compacting"
+META_SUFFIX = ".meta.json"
+BASE_SUFFIX = ".arrow"
+
+# Journal size at which a background compaction is started
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+
+_compaction_lock = threading.Lock()
+_compacting = set()
+
+# Single-blob store used before projects were split into their own files
+LEGACY_STORAGE_FILE = os.path.join(STORAGE_DIR, "uploaded_files.pkl")
+
+
+def project_path(file_key):
+    """Return the snapshot path for a project file_key"""
+    return os.path.join(PROJECTS_DIR, quote(file_key, safe='') + PROJECT_SUFFIX)
+
+
+def journal_path(file_key):
+    """Return the review journal path for a project file_key"""
+    return os.path.join(PROJECTS_DIR, quote(file_key, safe='') + JOURNAL_SUFFIX)
+
+
+def meta_path(file_key):
+    """Return the metadata side file path for a project file_key"""
+    return os.path.join(PROJECTS_DIR, quote(file_key, safe='') + META_SUFFIX)
+
+
+def lock_path(file_key):
+    """Return the lock file path for a project file_key"""
+    return os.path.join(PROJECTS_DIR, quote(file_key, safe='') + locks.LOCK_SUFFIX)
+
+
+def base_path(file_key, base_id):
+    """Return the Arrow base file path for a project file_key and base id"""
+    return os.path.join(PROJECTS_DIR, f"{quote(file_key, safe='')}.{base_id}{BASE_SUFFIX}")
+
+
+def _base_files(file_key):
+    """Paths of every Arrow base file stored for a project"""
+    if not os.path.isdir(PROJECTS_DIR):
+        return []
+    prefix = quote(file_key, safe='') + "."
+    paths = []
+    for name in os.listdir(PROJECTS_DIR):
+        if name.startswith(prefix) and name.endswith(BASE_SUFFIX):
+            base_id = name[len(prefix):-len(BASE_SUFFIX)]
+            if len(base_id) == 32 and all(c in '0123456789abcdef' for c in base_id):
+                paths.append(os.path.join(PROJECTS_DIR, name))
+    return paths
+
+
+def _remove_base_files(file_key, keep=None):
+    for path in _base_files(file_key):
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped by a reader on a platform that refuses; the next write retries
+            pass
+
+
+def _tmp_path(path):
+    # Unique per process and thread, so concurrent writers never share a temp file
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _atomic_pickle(obj, path):
+    """Pickle obj to path via a temp file so readers never see a partial write"""
+    tmp_path = _tmp_path(path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def migrate_legacy_store():
+    """Split the old uploaded_files.pkl blob into one file per project"""
+    if not os.path.exists(LEGACY_STORAGE_FILE):
+        return []
+
+    with open(LEGACY_STORAGE_FILE, 'rb') as f:
+        data = pickle.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Legacy storage file is not a dictionary")
+
+    os.makedirs(PROJECTS_DIR, exist_ok=True)
+    for file_key, df in data.items():
+        with locks.exclusive(lock_path(file_key)):
+            if not os.path.exists(project_path(file_key)):
+                _write_snapshot(file_key, df)
+
+
+    # Keep the old blob around for reference, but never read it again
+    os.replace(LEGACY_STORAGE_FILE, LEGACY_STORAGE_FILE + ".migrated")
+    return list(data.keys())
+
+
+def ensure_storage():
+    """Create the storage directories and migrate any legacy blob"""
+    os.makedirs(PROJECTS_DIR, exist_ok=True)
+    return migrate_legacy_store()
+
+
+def list_projects(queue_type=None):
+    """Return the file_keys of all stored projects, optionally for one queue"""
+    if not os.path.isdir(PROJECTS_DIR):
+        return []
+    file_keys = sorted(
+        unquote(name[:-len(PROJECT_SUFFIX)])
+        for name in os.listdir(PROJECTS_DIR)
+        if name.endswith(PROJECT_SUFFIX)
+    )
+    if queue_type is not None:
+        file_keys = [k for k in file_keys if parse_file_key(k)['queue_type'] == queue_type]
+    return file_keys
+
+
+def _read_journal(path):
+    """Read journal records, skipping a torn final line from an interrupted write"""
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def _locate_row(df, row_index, fido):
+    """Row label of a review's row, or None if it is not in df"""
+    if 'FIDO' in df.columns and fido is not None:
+        # Trust the FIDO over the stored index if the two disagree
+        if row_index not in df.index or str(df.at[row_index, 'FIDO']) != str(fido):
+            matches = df.index[df['FIDO'].astype(str) == str(fido)]
+            return matches[0] if len(matches) else None
+    elif row_index not in df.index:
+        return None
+    return row_index
+
+
+def _locate_rows(df, row_indexes, fidos):
+    """_locate_row for many reviews at once; a list of row labels with None where the row is not in df"""
+    labels = pd.Series(row_indexes, dtype=object)
+    found = labels.isin(df.index).to_numpy()
+    if 'FIDO' not in df.columns:
+        return [label if ok else None for label, ok in zip(row_indexes, found)]
+
+    fidos = pd.Series(fidos, dtype=object)
+    has_fido = fidos.notna().to_numpy()
+    stored = pd.Series(None, index=labels.index, dtype=object)
+    if found.any():
+        stored[found] = df['FIDO'].reindex(labels[found]).astype(str).to_numpy()
+    # Trust the FIDO over the stored index if the two disagree
+    agrees = found & (~has_fido | (stored.to_numpy() == fidos.astype(str).to_numpy()))
+    result = labels.where(agrees, None)
+    by_fido = has_fido & ~agrees
+    if by_fido.any():
+        first_rows = pd.Series(df.index, index=df['FIDO'].astype(str))
+        first_rows = first_rows[~first_rows.index.duplicated()]
+        result[by_fido] = fidos[by_fido].astype(str).map(first_rows).astype(object).to_numpy()
+    return [None if pd.isna(label) else label for label in result]
+
+
+def _apply_records(df, records):
+    """Replay journal records onto a project DataFrame in place.
+
+    Later records win cell by cell, so the values are gathered per column and
+    written with one vectorised assignment each instead of one per cell.
+    """
+    if not records:
+        return df
+    labels = _locate_rows(df, [r.get('index') for r in records], [r.get('fido') for r in records])
+    columns = {}
+    for row_index, record in zip(labels, records):
+        if row_index is None:
+            continue
+        for column, value in record.get('fields', {}).items():
+            columns.setdefault(column, {})[row_index] = value
+    for column, values in columns.items():
+        values = pd.Series(list(values.values()), index=list(values.keys()))
+        set_cells(df, values.index, column, values)
+    return df
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def project_version(file_key):
+    """Return a version token that changes whenever the project is written, or None if missing"""
+    snapshot = _file_version(project_path(file_key))
+    if snapshot is None:
+        return None
+    journal = journal_path(file_key)
+    return (snapshot, _file_version(journal + COMPACTING_SUFFIX), _file_version(journal))
+
+
+def project_versions():
+    """Return {file_key: version token} for every stored project"""
+    versions = {}
+    for file_key in list_projects():
+        version = project_version(file_key)
+        if version is not None:
+            versions[file_key] = version
+    return versions
+
+
+def _write_snapshot(file_key, df):
+    """Write a project snapshot, putting its read-only columns in a new Arrow base file when possible"""
+    path = project_path(file_key)
+    base = columnar.split_frame(df) if columnar.available() else {}
+    if not base:
+        _atomic_pickle(df, path)
+        _remove_base_files(file_key)
+        return
+    base_id = uuid.uuid4().hex
+    columnar.write_base(base_path(file_key, base_id), base, base_id)
+    _write_review_columns(file_key, df, base_id, list(base))
+
+
+def _write_review_columns(file_key, df, base_id, base_columns):
+    """Write the pickle half of a split snapshot and drop base files it no longer names"""
+    path = project_path(file_key)
+    _atomic_pickle({
+        'base_id': base_id,
+        'base_columns': base_columns,
+        'columns': list(df.columns),
+        'review': df.drop(columns=base_columns),
+    }, path)
+    _remove_base_files(file_key, keep=base_path(file_key, base_id))
+
+
+def _read_snapshot(file_key):
+    """Read a project snapshot; returns (DataFrame, split info or None)"""
+    with open(project_path(file_key), 'rb') as f:
+        snapshot = pickle.load(f)
+    if isinstance(snapshot, pd.DataFrame):
+        return snapshot, None
+
+    base_id, base = columnar.read_base(base_path(file_key, snapshot['base_id']))
+    if base_id != snapshot['base_id']:
+        raise ValueError(f"Arrow base file of '{file_key}' does not match its snapshot")
+    review = snapshot['review']
+    base.index = review.index
+    # Built column by column so the Arrow-backed columns are not copied
+    df = pd.DataFrame(
+        {column: base[column] if column in base.columns else review[column] for column in snapshot['columns']},
+        index=review.index,
+        copy=False,
+    )
+    return df, snapshot
+
+
+def load_project(file_key):
+    """Load a single project DataFrame with its journal applied, or None if it is not stored"""
+    with locks.shared(lock_path(file_key)):
+        return _load_project(file_key)
+
+
+def _load_project(file_key):
+    path = project_path(file_key)
+    journal = journal_path(file_key)
+    while True:
+        version = _file_version(path)
+        if version is None:
+            return None
+        try:
+            df, _ = _read_snapshot(file_key)
+        except FileNotFoundError:
+            # A save replaced the snapshot and removed its base file; read the new one
+            if _file_version(path) != version:
+                continue
+            raise
+        records = _read_journal(journal + COMPACTING_SUFFIX) + _read_journal(journal)
+        # A compaction swapped the snapshot while we were reading; start over
+        if _file_version(path) == version:
+            return _apply_records(df, records)
+
+
+def append_review(file_key, row_index, fido, fields, reviewer, expected_version=None, stats_delta=None,
+                  expected_row=None):
+    """Append one review submission to the project's journal and fsync it.
+
+    ``expected_row`` holds the row's review fields as the reviewer saw them
+    (see ``conflicts.row_state``); if the project has been written since
+    ``expected_version`` and that row changed, ConflictError is raised and
+    nothing is appended. ``stats_delta`` is added to the project's stored
+    aggregates, if any. Returns the project's new version token when the
+    project was still at ``expected_version`` and nothing else touched it
+    around this append, so the caller can mark its in-memory copy as current.
+    Returns None otherwise.
+    """
+    review = {
+        'row_index': row_index, 'fido': fido, 'fields': fields, 'reviewer': reviewer,
+        'stats_delta': stats_delta, 'expected_row': expected_row,
+    }
+    version, rejected = append_reviews(file_key, [review], expected_version)
+    if rejected:
+        raise rejected[0][1]
+    return version
+
+
+def _journal_line(file_key, review):
+    row_index = review['row_index']
+    if hasattr(row_index, 'item'):
+        # numpy integer labels are not JSON serialisable
+        row_index = row_index.item()
+    record = {
+        'file_key': file_key,
+        'index': row_index,
+        'fido': review['fido'],
+        'fields': review['fields'],
+        'reviewer': review['reviewer'],
+        'ts': datetime.now().isoformat(timespec='seconds'),
+    }
+    return (json.dumps(record, default=str) + "\n").encode('utf-8')
+
+
+def append_reviews(file_key, reviews, expected_version=None):
+    """Append a batch of review submissions to the journal with one write and one fsync.
+
+    Each review is a dict of ``append_review``'s arguments (row_index, fido,
+    fields, reviewer, stats_delta, expected_row). Reviews whose row another
+    user changed are left out. Returns (version, rejected): the version token
+    as for ``append_review`` and a list of (review, exception) for the
+    reviews that were not written (ConflictError when their row had changed).
+    """
+    os.makedirs(PROJECTS_DIR, exist_ok=True)
+    path = journal_path(file_key)
+    accepted, rejected = [], []
+    with locks.exclusive(lock_path(file_key)):
+        before = project_version(file_key)
+        current = None
+        for review in reviews:
+            if review.get('expected_row') is not None and before != expected_version:
+                # Someone else wrote the project since the caller's copy; make sure it was not this row
+                if current is None:
+                    current = _load_project(file_key)
+                current_index = (
+                    _locate_row(current, review['row_index'], review['fido']) if current is not None else None
+                )
+                if current_index is not None:
+                    try:
+                        check_row(review['fido'], current.loc[current_index], review['expected_row'])
+                    except ConflictError as e:
+                        rejected.append((review, e))
+                        continue
+            accepted.append(review)
+        lines = b''.join(_journal_line(file_key, review) for review in accepted)
+        if lines:
+            with open(path, 'ab') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        after = project_version(file_key)
+
+    stats_delta = {}
+    for review in accepted:
+        for key, value in (review.get('stats_delta') or {}).items():
+            stats_delta[key] = stats_delta.get(key, 0) + value
+    if stats_delta:
+        _add_to_aggregates(file_key, stats_delta)
+    if not lines or after is None or after[2] is None:
+        return None, rejected
+
+    if after[2][1] >= COMPACT_THRESHOLD_BYTES:
+        schedule_compaction(file_key)
+
+    previous_size = before[2][1] if before and before[2] else 0
+    if before is None or before != expected_version:
+        return None, rejected
+    if before[:2] != after[:2] or after[2][1] != previous_size + len(lines):
+        return None, rejected
+    return after, rejected
+
+
+def find_rows(file_key, status=None, fido=None):
+    """Indexed row lookup; the file backend has no index, so callers filter in memory"""
+    return None
+
+
+def compact_project(file_key):
+    """Fold a project's journal into its snapshot"""
+    # Submits wait until the journal is folded in; a save in between would be lost
+    with locks.exclusive(lock_path(file_key)):
+        _compact(file_key)
+
+
+def _compact(file_key):
+    journal = journal_path(file_key)
+    compacting = journal + COMPACTING_SUFFIX
+    # Submits that arrive while we compact go to a fresh journal
+    if not os.path.exists(compacting):
+        if not os.path.exists(journal):
+            return
+        os.replace(journal, compacting)
+
+    if os.path.exists(project_path(file_key)):
+        df, snapshot = _read_snapshot(file_key)
+        records = _read_journal(compacting)
+        df = _apply_records(df, records)
+        touched = {column for record in records for column in record.get('fields', {})}
+        if snapshot is not None and not touched & set(snapshot['base_columns']):
+            # Reviews only change review columns, so the Arrow base file is reused as is
+            _write_review_columns(file_key, df, snapshot['base_id'], snapshot['base_columns'])
+        else:
+            _write_snapshot(file_key, df)
+    os.remove(compacting)
+
+
+def _run_compaction(file_key):
+    try:
+        compact_project(file_key)
+    finally:
+        with _compaction_lock:
+            _compacting.discard(file_key)
+
+
+def schedule_compaction(file_key):
+    """Compact a project's journal on a background thread (one at a time per project)"""
+    with _compaction_lock:
+        if file_key in _compacting:
+            return
+        _compacting.add(file_key)
+    threading.Thread(target=_run_compaction, args=(file_key,), daemon=True).start()
+
+
+def save_project(file_key, df, expected_version=None):
+    """Write a single project snapshot.
+
+    With ``expected_version`` the save is refused with ConflictError if the
+    stored project is no longer at that version.
+    """
+    os.makedirs(PROJECTS_DIR, exist_ok=True)
+    with locks.exclusive(lock_path(file_key)):
+        check_version(file_key, project_version(file_key), expected_version)
+        _write_snapshot(file_key, df)
+
+
+def save_project_chunks(file_key, chunks):
+    """Write a new project from an iterable of DataFrame chunks and return the assembled DataFrame.
+
+    The snapshot is written in one piece, so the chunks are concatenated once,
+    given compact dtypes and written; nothing is stored if reading the chunks
+    fails.
+    """
+    df = compact_frame(pd.concat(chunks))
+    save_project(file_key, df)
+    return df
+
+
+def delete_project(file_key):
+    """Remove a project, its journal and metadata from storage (no-op if it does not exist)"""
+    journal = journal_path(file_key)
+    # The lock file itself stays: removing it would split waiting lockers across two files
+    with locks.exclusive(lock_path(file_key)):
+        for path in (project_path(file_key), journal, journal + COMPACTING_SUFFIX, meta_path(file_key)):
+            if os.path.exists(path):
+                os.remove(path)
+        _remove_base_files(file_key)
+
+
+def load_project_meta(file_key):
+    """Return a project's metadata dict ({} if none has been stored)"""
+    path = meta_path(file_key)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_all_project_meta(queue_type=None):
+    """Return {file_key: metadata} for every stored project, optionally for one queue"""
+    return {file_key: load_project_meta(file_key) for file_key in list_projects(queue_type)}
+
+
+def _write_meta(file_key, meta):
+    path = meta_path(file_key)
+    tmp_path = _tmp_path(path)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def update_project_meta(file_key, updates):
+    """Merge updates into a project's metadata"""
+    with locks.exclusive(meta_path(file_key) + locks.LOCK_SUFFIX):
+        meta = load_project_meta(file_key)
+        meta.update(updates)
+        _write_meta(file_key, meta)
+
+
+def _add_to_aggregates(file_key, delta):
+    """Add a review's contribution to the stored aggregates (left alone until they are built)"""
+    with locks.exclusive(meta_path(file_key) + locks.LOCK_SUFFIX):
+        meta = load_project_meta(file_key)
+        aggregates = meta.get('aggregates')
+        if aggregates is None:
+            return
+        for key, value in delta.items():
+            aggregates[key] = aggregates.get(key, 0) + value
+        _write_meta(file_key, meta)
@@ -0,0 +1,62 @@
+"""Streaming CSV ingestion for project uploads.
+
+Uploads are never read into memory whole. Emptiness is detected from the
+first non-blank bytes, the preview parses only its first rows, and the body is
+parsed once in chunks of ``CHUNK_ROWS`` rows that are handed to the store as
+they are produced.
+"""
+import pandas as pd
+
+# Rows parsed per chunk when ingesting an upload
+CHUNK_ROWS = 50_000
+
+# Rows parsed for the upload page preview
+PREVIEW_ROWS = 5
+
+# Bytes read at a time while looking for the first non-blank byte
+SNIFF_BYTES = 64 * 1024
+
+
+def has_content(file):
+    """True when the file holds anything besides whitespace, reading only up to the first non-blank byte"""
+    file.seek(0)
+    try:
+        while True:
+            block = file.read(SNIFF_BYTES)
+            if not block:
+                return False
+            if block.strip():
+                return True
+    finally:
+        file.seek(0)
+
+
+def read_preview(file, nrows=PREVIEW_ROWS):
+    """Parse only the first rows of a CSV upload"""
+    file.seek(0)
+    try:
+        return pd.read_csv(file, nrows=nrows)
+    finally:
+        file.seek(0)
+
+
+def read_chunks(file, chunksize=CHUNK_ROWS):
+    """Iterate over a CSV upload in DataFrame chunks; the row index runs on across chunks.
+
+    Every column is read as text. Inferring types per chunk would let chunks
+    of one upload disagree (a column of integers becomes float in the chunk
+    that has a blank cell); numeric GMV comes from ``add_upload_columns``.
+    """
+    file.seek(0)
+    return pd.read_csv(file, chunksize=chunksize, dtype=str)
+
+
+def add_upload_columns(chunk, metadata, gmv_col):
+    """Add the upload metadata columns and the standardized numeric GMV column to one chunk"""
+    for column, value in metadata.items():
+        chunk[column] = value
+    if gmv_col is None:
+        chunk['GMV'] = 0.0
+    else:
+        chunk['GMV'] = pd.to_numeric(chunk[gmv_col], errors='coerce').fillna(0)
+    return chunk
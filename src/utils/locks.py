@@ -0,0 +1,56 @@
+"""Cross-process reader/writer locks for the file store.
+
+Each lock is an ``flock`` on a small lock file next to the data it guards, so
+it holds between threads, Streamlit worker processes and server replicas that
+share the data directory (on a filesystem with working ``flock``). Any number
+of readers can hold a lock together; a writer holds it alone.
+
+Locks are not re-entrant: code holding a lock must not take the same lock
+again. Where ``fcntl`` is missing (Windows) the locks fall back to a plain
+mutex per lock file, which serialises only the threads of one process.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+
+_fallback_locks = {}
+_fallback_guard = threading.Lock()
+
+
+def _fallback_lock(path):
+    with _fallback_guard:
+        return _fallback_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextmanager
+def _flock(path, operation):
+    if fcntl is None:
+        with _fallback_lock(path):
+            yield
+        return
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, operation)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+def shared(path):
+    """Hold path's lock as a reader for the duration of a with block"""
+    return _flock(path, fcntl.LOCK_SH if fcntl else None)
+
+
+def exclusive(path):
+    """Hold path's lock as the only writer for the duration of a with block"""
+    return _flock(path, fcntl.LOCK_EX if fcntl else None)
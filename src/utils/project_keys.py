@@ -0,0 +1,24 @@
+"""Helpers for project file_keys.
+
+Uploads are stored under ``{queue}_{title}_{priority}_{YYYYmmdd}_{HHMMSS}``.
+"""
+
+PRIORITIES = ('high', 'medium', 'low')
+
+
+def parse_file_key(file_key):
+    """Split a file_key into queue_type, project_name, priority and upload date"""
+    parts = file_key.split('_')
+    info = {
+        'queue_type': parts[0],
+        'project_name': parts[1] if len(parts) > 1 else '',
+        'priority': 'medium',
+        'date': 'Unknown',
+    }
+    if len(parts) >= 5 and len(parts[-2]) == 8 and parts[-2].isdigit():
+        date_str = parts[-2]
+        info['date'] = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        if parts[-3] in PRIORITIES:
+            info['priority'] = parts[-3]
+            info['project_name'] = '_'.join(parts[1:-3])
+    return info
@@ -0,0 +1,50 @@
+"""Lightweight per-project summary rows for the overview and selection pages.
+
+A summary holds the project-level values those pages show (uploader, priority,
+upload date and claim state). It is stored in the project metadata next to the
+analytics aggregates, which supply the record, reviewed and GMV totals, so the
+pages can render every project card without loading its DataFrame.
+"""
+import pandas as pd
+
+SUMMARY_DEFAULTS = {
+    'uploader': 'Unknown',
+    'priority': 'medium',
+    'upload_date': None,
+    'claimed_by': None,
+    'claimed_date': None,
+    'project_status': 'Available',
+}
+
+
+def _first_value(df, column):
+    """First value of a column as text, or None when it is missing or blank"""
+    if column not in df.columns or len(df) == 0:
+        return None
+    value = df[column].iloc[0]
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or value == '':
+        return None
+    return str(value)
+
+
+def build_project_summary(df):
+    """Summary row for a project, read from the first record like the pages used to"""
+    summary = {}
+    for column, default in SUMMARY_DEFAULTS.items():
+        value = _first_value(df, column)
+        summary[column] = default if value is None else value
+    return summary
+
+
+def summary_row(meta):
+    """Combine a project's stored summary and aggregates into one card row, or None if either is missing"""
+    summary = meta.get('summary')
+    aggregates = meta.get('aggregates')
+    if summary is None or aggregates is None:
+        return None
+    row = dict(SUMMARY_DEFAULTS)
+    row.update(summary)
+    row['total'] = aggregates['total_records']
+    row['reviewed'] = aggregates['total_reviewed']
+    row['gmv'] = aggregates['total_gmv']
+    return row
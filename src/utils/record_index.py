@@ -0,0 +1,217 @@
+"""Global FIDO / UPC lookup across every stored project.
+
+Maps each lower-cased FIDO and BARCODE value to the (file_key, row label)
+pairs that hold it, so finding a record is one dict lookup instead of loading
+and scanning every project. Each project's entries are pickled to their own
+file under ``data/record_index``, so an upload or delete writes or removes
+only that project's file. Every session and server process shares the files:
+a process merges them into one map. Every write also replaces a small
+generation file, so a lookup only reads that file; the project files are
+listed, and the added, replaced or removed ones read, only after a change.
+
+FIDO and BARCODE come from the upload and are never changed by reviews, so a
+project is indexed once, on upload. ``sync`` indexes stored projects the map
+does not know yet (projects stored before the index existed) and drops
+projects that are gone.
+"""
+import os
+import pickle
+import threading
+import uuid
+from urllib.parse import quote, unquote
+
+from . import file_store
+
+INDEX_DIR = os.path.join(file_store.STORAGE_DIR, "record_index")
+INDEX_SUFFIX = ".pkl"
+
+# Replaced with a new token after every change to the project files
+GENERATION_FILE = "generation"
+
+# The single-file index used before per-project files; split up on first use
+LEGACY_INDEX_FILE = os.path.join(file_store.STORAGE_DIR, "record_index.pkl")
+
+# Columns whose values are indexed
+LOOKUP_COLUMNS = ['FIDO', 'BARCODE']
+
+
+def normalize(value):
+    """Lookup key for a FIDO or UPC: its text, stripped and lower-cased"""
+    return str(value).strip().lower()
+
+
+def project_entries(df):
+    """{lookup key: [row labels]} for one project's FIDO and BARCODE values"""
+    entries = {}
+    for column in LOOKUP_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column].dropna()
+        for key, row_label in zip(values.astype(str).str.strip().str.lower(), values.index):
+            if key:
+                entries.setdefault(key, []).append(row_label)
+    return entries
+
+
+class RecordIndex:
+    """Thread-safe {FIDO or UPC: [(file_key, row label), ...]} map over all projects"""
+
+    def __init__(self, path=INDEX_DIR, legacy_path=LEGACY_INDEX_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._generation = None
+        self._loaded = False
+        self._files = {}
+        self._records = {}
+        self._projects = {}
+
+    def _project_path(self, file_key):
+        # Quoted like file_store.project_path: the file_key holds the admin-typed project title
+        return os.path.join(self.path, quote(file_key, safe='') + INDEX_SUFFIX)
+
+    def _generation_path(self):
+        return os.path.join(self.path, GENERATION_FILE)
+
+    def _read_generation(self):
+        try:
+            with open(self._generation_path(), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _changed(self):
+        """Tell every process the project files changed"""
+        file_store._atomic_pickle(uuid.uuid4().hex, self._generation_path())
+
+    def _file_tokens(self):
+        """{file_key: token} of the project files; a replaced file gets a new inode"""
+        tokens = {}
+        try:
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(INDEX_SUFFIX):
+                        stat = entry.stat()
+                        tokens[unquote(entry.name[:-len(INDEX_SUFFIX)])] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return tokens
+
+    def _split_legacy(self):
+        """Write the entries of the old single-file index to per-project files, once"""
+        try:
+            with open(self.legacy_path, 'rb') as f:
+                stored = pickle.load(f)
+        except FileNotFoundError:
+            return
+        entries = {file_key: {} for file_key in stored['projects']}
+        for key, holders in stored['records'].items():
+            for file_key, row_label in holders:
+                entries.setdefault(file_key, {}).setdefault(key, []).append(row_label)
+        os.makedirs(self.path, exist_ok=True)
+        for file_key, project in entries.items():
+            if not os.path.exists(self._project_path(file_key)):
+                file_store._atomic_pickle(project, self._project_path(file_key))
+        try:
+            os.remove(self.legacy_path)
+        except FileNotFoundError:
+            # Another process split it at the same time
+            pass
+        self._changed()
+
+    def _reload(self):
+        """Pick up the project files other processes have written or removed since we last read them"""
+        generation = self._read_generation()
+        if self._loaded and generation == self._generation:
+            return
+        # Read before listing, so a change made while we list is picked up next time
+        self._generation, self._loaded = generation, True
+        self._split_legacy()
+        tokens = self._file_tokens()
+        for file_key in [file_key for file_key in self._files if file_key not in tokens]:
+            self._remove(file_key)
+        for file_key, token in tokens.items():
+            if self._files.get(file_key) == token:
+                continue
+            try:
+                with open(self._project_path(file_key), 'rb') as f:
+                    entries = pickle.load(f)
+            except FileNotFoundError:
+                # Removed since we listed it
+                self._remove(file_key)
+                continue
+            self._add(file_key, entries)
+            self._files[file_key] = token
+
+    def _add(self, file_key, entries):
+        self._remove(file_key)
+        for key, row_labels in entries.items():
+            self._records.setdefault(key, []).extend((file_key, row_label) for row_label in row_labels)
+        self._projects[file_key] = set(entries)
+
+    def _remove(self, file_key):
+        self._files.pop(file_key, None)
+        for key in self._projects.pop(file_key, ()):
+            remaining = [record for record in self._records.get(key, ()) if record[0] != file_key]
+            if remaining:
+                self._records[key] = remaining
+            else:
+                self._records.pop(key, None)
+
+    def _write(self, file_key, df):
+        entries = project_entries(df)
+        path = self._project_path(file_key)
+        os.makedirs(self.path, exist_ok=True)
+        file_store._atomic_pickle(entries, path)
+        self._add(file_key, entries)
+        stat = os.stat(path)
+        self._files[file_key] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._changed()
+
+    def _delete(self, file_key):
+        try:
+            os.remove(self._project_path(file_key))
+        except FileNotFoundError:
+            pass
+        else:
+            self._changed()
+        self._remove(file_key)
+
+    def add_project(self, file_key, df):
+        """Index (or re-index) one project's FIDO and BARCODE values"""
+        with self._lock:
+            self._write(file_key, df)
+
+    def remove_project(self, file_key):
+        """Drop a project from the index (no-op if it is not indexed)"""
+        with self._lock:
+            self._delete(file_key)
+
+    def sync(self, file_keys, loader):
+        """Index the given projects that are missing, via loader(file_key), and drop any others.
+
+        A project that cannot be loaded or indexed is skipped so the rest are
+        still indexed; returns {file_key: exception} of the skipped ones.
+        """
+        file_keys = set(file_keys)
+        failed = {}
+        with self._lock:
+            self._reload()
+            for file_key in [file_key for file_key in self._projects if file_key not in file_keys]:
+                self._delete(file_key)
+            for file_key in sorted(file_keys - set(self._projects)):
+                try:
+                    df = loader(file_key)
+                    if df is not None:
+                        self._write(file_key, df)
+                except Exception as e:
+                    failed[file_key] = e
+        return failed
+
+    def lookup(self, value):
+        """Return [(file_key, row label), ...] of the records whose FIDO or UPC equals value"""
+        key = normalize(value)
+        with self._lock:
+            self._reload()
+            # A row whose FIDO and UPC are the same text is listed once
+            return list(dict.fromkeys(self._records.get(key, ())))
@@ -0,0 +1,90 @@
+"""Versioned column migrations for stored projects.
+
+Each project's metadata records the ``schema_version`` its columns are at:
+the number of ``MIGRATIONS`` that have been applied to it. ``migrate_projects``
+runs once per server process at startup and brings every stored project that
+is behind up to ``SCHEMA_VERSION``, so page reruns never have to check each
+project's columns. New uploads are written at the current version.
+
+To add columns, append a migration to ``MIGRATIONS``. Never edit, remove or
+reorder the existing ones: stored versions count them.
+"""
+import pandas as pd
+
+from .conflicts import ConflictError
+
+
+def _add_columns(df, defaults):
+    """Add the columns of defaults that df lacks; returns whether any were added"""
+    missing = [column for column in defaults if column not in df.columns]
+    for column in missing:
+        df[column] = defaults[column]
+    return bool(missing)
+
+
+def _add_claim_columns(df):
+    """Claim columns used by the project selection pages (version 1)"""
+    return _add_columns(df, {'claimed_by': '', 'claimed_date': '', 'project_status': 'Available'})
+
+
+def _add_review_columns(df):
+    """Review result columns, which older projects only got with their first review (version 2)"""
+    added = _add_columns(df, {'updated_description': '', 'updated_category': '', 'updated_brand': ''})
+    if 'no_change' not in df.columns:
+        # Reviewed rows without the column were not "no change" reviews
+        df['no_change'] = pd.Series(False, index=df.index, dtype='boolean')
+        added = True
+    return added
+
+
+# Applied in order; a project at version n has had the first n
+MIGRATIONS = [
+    _add_claim_columns,
+    _add_review_columns,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def stored_version(meta):
+    """Schema version recorded in a project's metadata (0 for projects stored before versioning)"""
+    return meta.get('schema_version', 0)
+
+
+def upgrade(df, version=0):
+    """Apply the migrations after ``version`` to df in place; returns whether df changed"""
+    changed = False
+    for migration in MIGRATIONS[version:]:
+        changed = migration(df) or changed
+    return changed
+
+
+def at_current_version(df):
+    """Return a new upload's frame with every migration applied"""
+    upgrade(df)
+    return df
+
+
+def migrate_projects(storage):
+    """Bring every stored project behind SCHEMA_VERSION up to date; returns the migrated file_keys.
+
+    A project that changes while it is being migrated is left for the next
+    start; the review already stored wins over the migrated copy.
+    """
+    migrated = []
+    for file_key, meta in storage.load_all_project_meta().items():
+        version = stored_version(meta)
+        if version >= SCHEMA_VERSION:
+            continue
+        project_version = storage.project_version(file_key)
+        df = storage.load_project(file_key)
+        if df is None:
+            continue
+        if upgrade(df, version):
+            try:
+                storage.save_project(file_key, df, expected_version=project_version)
+            except ConflictError:
+                continue
+        storage.update_project_meta(file_key, {'schema_version': SCHEMA_VERSION})
+        migrated.append(file_key)
+    return migrated
@@ -0,0 +1,118 @@
+"""Case-insensitive substring search over a project's text columns.
+
+Each searchable column is indexed over its distinct lower-cased values:
+
+- a trigram inverted index (trigram -> sorted value codes), built with NumPy,
+  answers queries of three or more characters by intersecting posting lists
+  and checking only the surviving values;
+- the integer value code of every row maps matching values back to rows with
+  one vectorised lookup.
+
+Queries shorter than three characters match most values anyway and are
+answered by scanning the distinct values.
+"""
+import numpy as np
+import pandas as pd
+
+SEARCH_COLUMNS = ['FIDO', 'BARCODE', 'BRAND', 'CATEGORY', 'DESCRIPTION']
+
+# Candidate count below which values are checked directly instead of intersecting more postings
+DIRECT_CHECK_LIMIT = 256
+
+_SEP = '\x00'
+
+
+class _ColumnIndex:
+    """Trigram index over the distinct lower-cased values of one column"""
+
+    def __init__(self, values):
+        # NaN keeps its own code and reads as 'nan', as it did with astype(str)
+        self.codes, uniques = pd.factorize(values.to_numpy(dtype=object), use_na_sentinel=False)
+        self.texts = [str(value).lower().replace(_SEP, ' ') for value in uniques]
+        self._build_trigrams()
+
+    def _build_trigrams(self):
+        # Every value framed by separators, as one array of code points
+        blob = _SEP + _SEP.join(self.texts) + _SEP
+        chars = np.frombuffer(blob.encode('utf-32-le'), dtype=np.uint32)
+        # Dense symbol numbers for the characters that occur, via a lookup table
+        present = np.zeros(int(chars.max()) + 1, dtype=bool)
+        present[chars] = True
+        alphabet = np.flatnonzero(present)
+        symbols = (np.cumsum(present) - 1)[chars]
+        self._alphabet = {chr(c): i for i, c in enumerate(alphabet.tolist())}
+        self._base = len(alphabet)
+
+        # Value code owning each position; separators (symbol 0) start a new value
+        owner = np.cumsum(chars == 0) - 1
+        trigrams = (symbols[:-2].astype(np.int64) * self._base + symbols[1:-1]) * self._base + symbols[2:]
+        inside = (chars[:-2] != 0) & (chars[1:-1] != 0) & (chars[2:] != 0)
+
+        # One sorted, de-duplicated (trigram, value code) pair per occurrence
+        value_count = max(len(self.texts), 1)
+        pairs = np.sort(trigrams[inside] * value_count + owner[:-2][inside])
+        if len(pairs):
+            pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        self._trigram_keys = pairs // value_count
+        self._trigram_values = pairs % value_count
+
+    def _trigram(self, text):
+        try:
+            a, b, c = (self._alphabet[ch] for ch in text)
+        except KeyError:
+            return None
+        return (a * self._base + b) * self._base + c
+
+    def _postings(self, key):
+        start, end = np.searchsorted(self._trigram_keys, [key, key + 1])
+        return self._trigram_values[start:end]
+
+    def matching_values(self, term):
+        """Codes of the distinct values containing term"""
+        if len(term) < 3:
+            return [code for code, text in enumerate(self.texts) if term in text]
+
+        keys = {self._trigram(term[start:start + 3]) for start in range(len(term) - 2)}
+        if None in keys:
+            return []
+        # Rarest trigrams first; once few candidates remain, checking them directly is cheaper
+        postings = sorted((self._postings(key) for key in keys), key=len)
+        candidates = postings[0]
+        for other in postings[1:]:
+            if len(candidates) <= DIRECT_CHECK_LIMIT:
+                break
+            candidates = np.intersect1d(candidates, other, assume_unique=True)
+        if len(term) == 3:
+            return candidates
+        # Shared trigrams do not guarantee the whole term appears in order
+        return [code for code in candidates.tolist() if term in self.texts[code]]
+
+    def rows_with(self, values):
+        """Boolean row mask for rows holding any of the given value codes"""
+        flags = np.zeros(len(self.texts), dtype=bool)
+        flags[values] = True
+        return flags[self.codes]
+
+
+class SearchIndex:
+    """Substring search over FIDO, BARCODE, BRAND, CATEGORY and DESCRIPTION of one project"""
+
+    def __init__(self, df, columns=SEARCH_COLUMNS):
+        self.index = df.index
+        self._columns = {
+            column: _ColumnIndex(df[column])
+            for column in columns if column in df.columns
+        }
+
+    def search(self, term):
+        """Boolean mask over the project's rows matching term (case insensitive, literal text)"""
+        term = term.lower().replace(_SEP, ' ')
+        if not term:
+            return np.ones(len(self.index), dtype=bool)
+
+        mask = np.zeros(len(self.index), dtype=bool)
+        for column in self._columns.values():
+            values = column.matching_values(term)
+            if len(values):
+                mask |= column.rows_with(values)
+        return mask
@@ -0,0 +1,400 @@
+"""SQLite storage backend for uploaded FIDO review projects.
+
+Projects live in a ``projects`` table and their records in ``fido_rows``, one
+row per FIDO with the full record kept as JSON. Indexes on (project_id, fido),
+(project_id, status) and (queue_type) turn row lookups, status filters and
+queue listings into indexed queries, and a review submit is a single-row
+UPDATE. Uses only the standard library.
+
+Each project carries an integer ``version`` that is bumped on every write and
+serves as its version token, and a JSON ``meta`` column for small per-project
+metadata such as the analytics aggregates and the project card summary.
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from . import file_store
+from .compact import compact_chunks, compact_frame, concat_chunks
+from .conflicts import ConflictError, check_row, check_version
+from .project_keys import parse_file_key
+
+STORAGE_DIR = file_store.STORAGE_DIR
+DB_FILE = os.path.join(STORAGE_DIR, "fido_review.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    file_key TEXT NOT NULL UNIQUE,
+    queue_type TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    upload_date TEXT,
+    uploader TEXT,
+    columns TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS fido_rows (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    row_idx INTEGER NOT NULL,
+    fido TEXT,
+    status TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (project_id, row_idx)
+);
+CREATE TABLE IF NOT EXISTS review_log (
+    id INTEGER PRIMARY KEY,
+    file_key TEXT NOT NULL,
+    fido TEXT,
+    fields TEXT NOT NULL,
+    reviewer TEXT,
+    ts TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fido_rows_fido ON fido_rows (project_id, fido);
+CREATE INDEX IF NOT EXISTS idx_fido_rows_status ON fido_rows (project_id, status);
+CREATE INDEX IF NOT EXISTS idx_projects_queue ON projects (queue_type);
+"""
+
+_local = threading.local()
+
+
+def _connect():
+    """Return this thread's connection, opening it on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(STORAGE_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_FILE, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        _local.conn = conn
+    return conn
+
+
+class _transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around a block"""
+
+    def __enter__(self):
+        self.conn = _connect()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _json_default(value):
+    if value is pd.NA:
+        return None
+    # numpy scalars and timestamps
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default)
+
+
+def _cell(value):
+    return None if value is None or value is pd.NA or (isinstance(value, float) and value != value) else str(value)
+
+
+def _first_value(df, column):
+    if column in df.columns and len(df) > 0:
+        return _cell(df[column].iloc[0])
+    return None
+
+
+def ensure_storage():
+    """Create the schema and import projects from the file store on first use"""
+    conn = _connect()
+    conn.executescript(SCHEMA)
+    project_columns = [row[1] for row in conn.execute("PRAGMA table_info(projects)")]
+    if 'meta' not in project_columns:
+        conn.execute("ALTER TABLE projects ADD COLUMN meta TEXT NOT NULL DEFAULT '{}'")
+    if conn.execute("SELECT 1 FROM projects LIMIT 1").fetchone():
+        return []
+
+    imported = []
+    if os.path.exists(file_store.LEGACY_STORAGE_FILE):
+        with open(file_store.LEGACY_STORAGE_FILE, 'rb') as f:
+            data = pickle.load(f)
+        for file_key, df in data.items():
+            save_project(file_key, df)
+            imported.append(file_key)
+    for file_key in file_store.list_projects():
+        if file_key not in imported:
+            save_project(file_key, file_store.load_project(file_key))
+            imported.append(file_key)
+    return imported
+
+
+def list_projects(queue_type=None):
+    """Return the file_keys of all stored projects, optionally for one queue"""
+    if queue_type is None:
+        rows = _connect().execute("SELECT file_key FROM projects ORDER BY file_key")
+    else:
+        rows = _connect().execute(
+            "SELECT file_key FROM projects WHERE queue_type = ? ORDER BY file_key", (queue_type,)
+        )
+    return [row[0] for row in rows]
+
+
+def project_version(file_key):
+    """Return the project's write counter, or None if it is not stored"""
+    row = _connect().execute("SELECT version FROM projects WHERE file_key = ?", (file_key,)).fetchone()
+    return row[0] if row else None
+
+
+def project_versions():
+    """Return {file_key: version} for every stored project"""
+    return dict(_connect().execute("SELECT file_key, version FROM projects"))
+
+
+def load_project(file_key):
+    """Load a single project DataFrame, or None if it is not stored"""
+    conn = _connect()
+    project = conn.execute("SELECT id, columns FROM projects WHERE file_key = ?", (file_key,)).fetchone()
+    if project is None:
+        return None
+    project_id, columns = project
+    rows = conn.execute(
+        "SELECT row_idx, data FROM fido_rows WHERE project_id = ? ORDER BY row_idx", (project_id,)
+    ).fetchall()
+    # Rows come back as plain Python values, so give them compact dtypes again
+    return compact_frame(pd.DataFrame(
+        [json.loads(data) for _, data in rows],
+        index=[row_idx for row_idx, _ in rows],
+        columns=json.loads(columns),
+    ))
+
+
+def _write_project(conn, file_key, df):
+    """Create or reset a project row from df's columns and metadata and return its id"""
+    info = parse_file_key(file_key)
+    columns = [str(c) for c in df.columns]
+    existing = conn.execute("SELECT id FROM projects WHERE file_key = ?", (file_key,)).fetchone()
+    values = (
+        info['queue_type'], info['project_name'], _first_value(df, 'priority') or info['priority'],
+        _first_value(df, 'upload_date'), _first_value(df, 'uploader'), _dumps(columns),
+    )
+    if existing:
+        project_id = existing[0]
+        conn.execute(
+            "UPDATE projects SET queue_type = ?, project_name = ?, priority = ?, upload_date = ?, "
+            "uploader = ?, columns = ?, version = version + 1 WHERE id = ?",
+            values + (project_id,)
+        )
+        conn.execute("DELETE FROM fido_rows WHERE project_id = ?", (project_id,))
+        return project_id
+    return conn.execute(
+        "INSERT INTO projects (file_key, queue_type, project_name, priority, upload_date, "
+        "uploader, columns) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (file_key,) + values
+    ).lastrowid
+
+
+def _insert_rows(conn, project_id, df, first_row=0):
+    """Insert df's records, numbering them from first_row unless df has an integer index"""
+    if pd.api.types.is_integer_dtype(df.index):
+        row_ids = [int(i) for i in df.index]
+    else:
+        row_ids = range(first_row, first_row + len(df))
+    conn.executemany(
+        "INSERT INTO fido_rows (project_id, row_idx, fido, status, data) VALUES (?, ?, ?, ?, ?)",
+        (
+            (project_id, row_idx, _cell(record.get('FIDO')), _cell(record.get('status')),
+             _dumps({str(k): v for k, v in record.items()}))
+            for row_idx, record in zip(row_ids, df.to_dict('records'))
+        )
+    )
+
+
+def save_project(file_key, df, expected_version=None):
+    """Replace a project and all of its rows.
+
+    With ``expected_version`` the save is refused with ConflictError if the
+    stored project is no longer at that version.
+    """
+    with _transaction() as conn:
+        row = conn.execute("SELECT version FROM projects WHERE file_key = ?", (file_key,)).fetchone()
+        check_version(file_key, row[0] if row else None, expected_version)
+        project_id = _write_project(conn, file_key, df)
+        _insert_rows(conn, project_id, df)
+
+
+def save_project_chunks(file_key, chunks):
+    """Write a project from an iterable of DataFrame chunks and return it as stored.
+
+    Each chunk gets the compact dtypes fixed from the first one and is inserted
+    as it arrives, inside one transaction, so nothing is stored if reading the
+    chunks fails part way through. The returned DataFrame is joined from the
+    chunks already in memory instead of being read back.
+    """
+    project_id = None
+    row_count = 0
+    parts = []
+    with _transaction() as conn:
+        for chunk in compact_chunks(chunks):
+            if project_id is None:
+                project_id = _write_project(conn, file_key, chunk)
+            _insert_rows(conn, project_id, chunk, row_count)
+            row_count += len(chunk)
+            parts.append(chunk)
+    if project_id is None:
+        raise ValueError("No data to store")
+    return concat_chunks(parts)
+
+
+def delete_project(file_key):
+    """Remove a project and its rows (no-op if it does not exist)"""
+    with _transaction() as conn:
+        conn.execute("DELETE FROM projects WHERE file_key = ?", (file_key,))
+
+
+def append_review(file_key, row_index, fido, fields, reviewer, expected_version=None, stats_delta=None,
+                  expected_row=None):
+    """Apply one review submission as a single-row UPDATE.
+
+    ``expected_row`` holds the row's review fields as the reviewer saw them
+    (see ``conflicts.row_state``); ConflictError is raised and nothing is
+    written if the stored row no longer has them. ``stats_delta`` is added
+    to the project's stored aggregates in the same transaction. Returns the
+    project's new version when it was at ``expected_version`` before this
+    write, otherwise None.
+    """
+    review = {
+        'row_index': row_index, 'fido': fido, 'fields': fields, 'reviewer': reviewer,
+        'stats_delta': stats_delta, 'expected_row': expected_row,
+    }
+    version, rejected = append_reviews(file_key, [review], expected_version)
+    if rejected:
+        raise rejected[0][1]
+    return version
+
+
+def append_reviews(file_key, reviews, expected_version=None):
+    """Apply a batch of review submissions in one transaction with a single version bump.
+
+    Each review is a dict of ``append_review``'s arguments (row_index, fido,
+    fields, reviewer, stats_delta, expected_row). Reviews whose row another
+    user changed are left out. Returns (version, rejected): the new version
+    as for ``append_review`` and a list of (review, exception) for the
+    reviews that were not written (ConflictError when their row had changed).
+    """
+    rejected = []
+    written = 0
+    with _transaction() as conn:
+        project = conn.execute(
+            "SELECT id, columns, version, meta FROM projects WHERE file_key = ?", (file_key,)
+        ).fetchone()
+        if project is None:
+            raise KeyError(f"Project '{file_key}' not found")
+        project_id, columns, version, meta = project
+        columns = json.loads(columns)
+        meta = json.loads(meta)
+        aggregates = meta.get('aggregates')
+        now = datetime.now().isoformat(timespec='seconds')
+
+        for review in reviews:
+            row_index = review['row_index']
+            if hasattr(row_index, 'item'):
+                row_index = row_index.item()
+            fido = _cell(review['fido'])
+            fields = review['fields']
+
+            row = conn.execute(
+                "SELECT row_idx, fido, data FROM fido_rows WHERE project_id = ? AND row_idx = ?",
+                (project_id, row_index)
+            ).fetchone()
+            if row is None or (fido is not None and row[1] != fido):
+                row = conn.execute(
+                    "SELECT row_idx, fido, data FROM fido_rows WHERE project_id = ? AND fido = ? "
+                    "ORDER BY row_idx LIMIT 1",
+                    (project_id, fido)
+                ).fetchone()
+            if row is None:
+                rejected.append((review, KeyError(f"FIDO {fido} not found in '{file_key}'")))
+                continue
+
+            data = json.loads(row[2])
+            if version != expected_version:
+                try:
+                    check_row(fido, data, review.get('expected_row'))
+                except ConflictError as e:
+                    rejected.append((review, e))
+                    continue
+            data.update(fields)
+            conn.execute(
+                "UPDATE fido_rows SET status = ?, data = ? WHERE project_id = ? AND row_idx = ?",
+                (_cell(data.get('status')), _dumps(data), project_id, row[0])
+            )
+            columns += [c for c in fields if c not in columns]
+            if review.get('stats_delta') and aggregates is not None:
+                for key, value in review['stats_delta'].items():
+                    aggregates[key] = aggregates.get(key, 0) + value
+            conn.execute(
+                "INSERT INTO review_log (file_key, fido, fields, reviewer, ts) VALUES (?, ?, ?, ?, ?)",
+                (file_key, fido, _dumps(fields), review['reviewer'], now)
+            )
+            written += 1
+
+        if written:
+            conn.execute(
+                "UPDATE projects SET columns = ?, meta = ?, version = version + 1 WHERE id = ?",
+                (_dumps(columns), _dumps(meta), project_id)
+            )
+
+    if not written or version != expected_version:
+        return None, rejected
+    return version + 1, rejected
+
+
+def load_project_meta(file_key):
+    """Return a project's metadata dict ({} if none has been stored)"""
+    row = _connect().execute("SELECT meta FROM projects WHERE file_key = ?", (file_key,)).fetchone()
+    return json.loads(row[0]) if row else {}
+
+
+def load_all_project_meta(queue_type=None):
+    """Return {file_key: metadata} for every stored project, optionally for one queue"""
+    if queue_type is None:
+        rows = _connect().execute("SELECT file_key, meta FROM projects")
+    else:
+        rows = _connect().execute("SELECT file_key, meta FROM projects WHERE queue_type = ?", (queue_type,))
+    return {file_key: json.loads(meta) for file_key, meta in rows}
+
+
+def update_project_meta(file_key, updates):
+    """Merge updates into a project's metadata"""
+    with _transaction() as conn:
+        row = conn.execute("SELECT meta FROM projects WHERE file_key = ?", (file_key,)).fetchone()
+        if row is None:
+            return
+        meta = json.loads(row[0])
+        meta.update(updates)
+        conn.execute("UPDATE projects SET meta = ? WHERE file_key = ?", (_dumps(meta), file_key))
+
+
+def find_rows(file_key, status=None, fido=None):
+    """Return the row indexes matching status and/or FIDO using the table indexes"""
+    query = "SELECT r.row_idx FROM fido_rows r JOIN projects p ON p.id = r.project_id WHERE p.file_key = ?"
+    params = [file_key]
+    if status is not None:
+        query += " AND r.status = ?"
+        params.append(status)
+    if fido is not None:
+        query += " AND r.fido = ?"
+        params.append(_cell(fido))
+    return [row[0] for row in _connect().execute(query + " ORDER BY r.row_idx", params)]
+
+
+def compact_project(file_key):
+    """Nothing to compact; reviews are written in place"""
@@ -0,0 +1,30 @@
+"""Project storage used by the app.
+
+Re-exports the functions of the configured backend. Set the
+``FIDO_STORAGE_BACKEND`` environment variable to ``sqlite`` to use the SQLite
+backend; the default is the per-project file store.
+"""
+import os
+
+STORAGE_BACKEND = os.environ.get('FIDO_STORAGE_BACKEND', 'file').lower()
+
+if STORAGE_BACKEND == 'sqlite':
+    from . import sqlite_store as backend
+else:
+    from . import file_store as backend
+
+ensure_storage = backend.ensure_storage
+list_projects = backend.list_projects
+project_version = backend.project_version
+project_versions = backend.project_versions
+load_project = backend.load_project
+save_project = backend.save_project
+save_project_chunks = backend.save_project_chunks
+delete_project = backend.delete_project
+append_review = backend.append_review
+append_reviews = backend.append_reviews
+find_rows = backend.find_rows
+load_project_meta = backend.load_project_meta
+load_all_project_meta = backend.load_all_project_meta
+update_project_meta = backend.update_project_meta
+compact_project = backend.compact_project
@@ -0,0 +1,154 @@
+"""Background writer for review submissions.
+
+A submit is applied to the reviewer's in-memory copy at once and handed to
+``WriteQueue``, so the page does not wait on the journal fsync or the SQLite
+transaction. A single writer thread drains the queue:
+
+- submits to the same project are written as one batch (one journal write and
+  fsync, or one transaction) through the store's ``append_reviews``;
+- repeated submits to the same row are coalesced into one review;
+- after a write it waits ``FLUSH_INTERVAL_MS`` before the next one, so a burst
+  of submits shares a write instead of paying for one each.
+
+Each submit gets a ticket. ``status`` tells a session how many of its tickets
+are still waiting and which were refused, which drives the "saved" indicator.
+Pending submits are flushed when the process exits.
+"""
+import atexit
+import itertools
+import threading
+import time
+
+# Shortest gap between two writes; submits arriving in between are batched
+FLUSH_INTERVAL_MS = 200
+
+
+def _coalesce(items):
+    """Merge queued submits to the same row into one review; returns [(tickets, review)]"""
+    merged = {}
+    for ticket, review in items:
+        key = (review['row_index'], review['fido'])
+        if key not in merged:
+            merged[key] = ([ticket], dict(review))
+            continue
+        tickets, combined = merged[key]
+        tickets.append(ticket)
+        # The later submit wins field by field; the first one's expected_row is what the store holds
+        combined['fields'] = {**combined['fields'], **review['fields']}
+        combined['reviewer'] = review['reviewer']
+        stats_delta = dict(combined.get('stats_delta') or {})
+        for stat, value in (review.get('stats_delta') or {}).items():
+            stats_delta[stat] = stats_delta.get(stat, 0) + value
+        combined['stats_delta'] = stats_delta
+    return list(merged.values())
+
+
+class WriteQueue:
+    """Batches review submits per project and writes them on a background thread.
+
+    ``writer(file_key, reviews, expected_version)`` stores a batch and returns
+    (version, rejected) like ``storage.append_reviews``. ``on_written(file_key,
+    expected_version, version, reviews)`` is called after each batch with the
+    reviews as written; version is None unless the batch was the only change
+    since expected_version and every review in it was stored.
+    """
+
+    def __init__(self, writer, on_written=None, flush_interval_ms=FLUSH_INTERVAL_MS):
+        self._writer = writer
+        self._on_written = on_written
+        self._interval = flush_interval_ms / 1000
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        self._writing = {}
+        self._failed = {}
+        self._tickets = itertools.count(1)
+        self._last_write = 0.0
+        self._thread = None
+        atexit.register(self.flush)
+
+    def submit(self, file_key, review, expected_version=None):
+        """Queue one review (a dict of append_review's arguments) and return its ticket"""
+        with self._cond:
+            ticket = next(self._tickets)
+            self._pending.setdefault(file_key, []).append((ticket, review, expected_version))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="review-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return ticket
+
+    def status(self, tickets):
+        """Return {'pending': count, 'failed': [(file_key, review, exception)]} for a session's tickets"""
+        with self._cond:
+            queued = {ticket for items in self._pending.values() for ticket, _, _ in items}
+            pending = sum(1 for ticket in tickets if ticket in queued or ticket in self._writing)
+            failed = [self._failed.pop(ticket) for ticket in tickets if ticket in self._failed]
+        return {'pending': pending, 'failed': failed}
+
+    def pending_projects(self, tickets):
+        """file_keys that still have reviews among tickets waiting to be written"""
+        tickets = set(tickets)
+        with self._cond:
+            projects = {
+                file_key for file_key, items in self._pending.items()
+                if any(ticket in tickets for ticket, _, _ in items)
+            }
+            projects.update(file_key for ticket, file_key in self._writing.items() if ticket in tickets)
+        return projects
+
+    def flush(self):
+        """Write everything queued so far before returning"""
+        self._write_pending()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                delay = self._last_write + self._interval - time.monotonic()
+            if delay > 0:
+                # Let the burst build up; everything that arrives meanwhile goes in the same write
+                time.sleep(delay)
+            self._write_pending()
+
+    def _write_pending(self):
+        # One batch at a time, so a project's batches reach the store in submit order
+        with self._write_lock:
+            with self._cond:
+                batches, self._pending = self._pending, {}
+                for file_key, items in batches.items():
+                    self._writing.update((ticket, file_key) for ticket, _, _ in items)
+            try:
+                for file_key, items in batches.items():
+                    self._write(file_key, items)
+            finally:
+                with self._cond:
+                    self._writing.clear()
+                    self._last_write = time.monotonic()
+                    self._cond.notify_all()
+
+    def _write(self, file_key, items):
+        expected_versions = {expected_version for _, _, expected_version in items}
+        # Submits made against different copies cannot vouch for one version
+        expected_version = expected_versions.pop() if len(expected_versions) == 1 else None
+        merged = _coalesce([(ticket, review) for ticket, review, _ in items])
+        reviews = [review for _, review in merged]
+        try:
+            version, rejected = self._writer(file_key, reviews, expected_version)
+        except Exception as e:
+            version, rejected = None, [(review, e) for review in reviews]
+
+        if rejected:
+            version = None
+            with self._cond:
+                for review, error in rejected:
+                    tickets = next(tickets for tickets, merged_review in merged if merged_review is review)
+                    for ticket in tickets:
+                        self._failed[ticket] = (file_key, review, error)
+        if self._on_written is not None:
+            try:
+                self._on_written(file_key, expected_version, version, reviews)
+            except Exception:
+                # A failing callback must not stop the writer thread; the data is already stored
+                pass